@@ -4,8 +4,14 @@ Database management for book indexing application
 import sqlite3
 import re
 import shutil
+import threading
+import functools
+import bisect
+import uuid
+from operator import itemgetter
+import itertools
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Iterator
 
 # Required tables and their columns for database validation
 REQUIRED_TABLES = {
@@ -18,10 +24,74 @@ REQUIRED_TABLES = {
     'gap_exclusions': ['id', 'book_number', 'page_start', 'page_end', 'created_at']
 }
 
+# First 16 bytes of every SQLite 3 database file
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+FILENAME_UNSAFE_RE = re.compile(r'[^\w\s-]')
+
+def safe_file_stem(name: str) -> str:
+    """Strip characters unsafe in filenames and join words with '_': 'My Index!' -> 'My_Index'"""
+    return FILENAME_UNSAFE_RE.sub('', name).strip().replace(' ', '_')
+
 def sanitize_db_name(index_name: str) -> str:
     """Convert index name to safe filename: 'My Index' -> 'index_My_Index.db'"""
-    safe = re.sub(r'[^\w\s-]', '', index_name).strip().replace(' ', '_')
-    return f"index_{safe}.db"
+    return f"index_{safe_file_stem(index_name)}.db"
+
+REFERENCE_RE = re.compile(r'^(\d+):(\d+)(?:-(\d+))?$')
+PAGE_RANGE_RE = re.compile(r'^(\d+)(?:-(\d+))?$')
+
+def parse_page_range(range_str: str) -> Tuple[int, int]:
+    """Parse a page range '10' or '10-15' into (page_start, page_end)"""
+    match = PAGE_RANGE_RE.match(range_str)
+    if not match:
+        raise ValueError(f"{range_str}. Use p or p-p")
+    page_start = int(match.group(1))
+    page_end = int(match.group(2)) if match.group(2) else page_start
+    if page_end < page_start:
+        raise ValueError(f"End page {page_end} cannot be less than start page {page_start}")
+    return page_start, page_end
+
+# Applied to every connection IndexDatabase opens (WAL itself is set once in init_database)
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA cache_size=-20000',
+)
+
+
+def _page_bits(page_start: int, page_end: int) -> int:
+    """Bitmap with bits page_start..page_end set (empty if the range is)"""
+    if page_end < page_start or page_end < 0:
+        return 0
+    page_start = max(page_start, 0)
+    return ((1 << (page_end - page_start + 1)) - 1) << page_start
+
+
+def _mutates(method):
+    """Mark an IndexDatabase method as a write: bumps db.version so cached reads refresh"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.version += 1
+    return wrapper
+
+
+def _file_signature(db_file: Path) -> Tuple:
+    """
+    (mtime, size) of a database file and its WAL; any committed write changes one of them
+    """
+    signature = []
+    for path in (db_file, db_file.with_name(db_file.name + '-wal')):
+        try:
+            stat = path.stat()
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
 
 
 class DatabaseManager:
@@ -31,33 +101,48 @@ class DatabaseManager:
         self.databases_dir = Path(databases_dir)
         self.databases_dir.mkdir(exist_ok=True)
         self.cache = {}  # Cache for loaded database instances
+        self._lock = threading.Lock()
+        # db_name -> (file signature, index name), so list_databases only opens changed files
+        self._index_names = {}
+        # db_name -> data_version() of its download snapshot in .backups
+        self._snapshots = {}
+        self._snapshot_lock = threading.Lock()
 
     def list_databases(self) -> List[Dict[str, str]]:
         """Discover all .db files and extract their index names"""
         databases = []
+        index_names = {}
 
         for db_file in self.databases_dir.glob('*.db'):
+            signature = _file_signature(db_file)
+            cached = self._index_names.get(db_file.name)
+            if cached is not None and cached[0] == signature:
+                index_name = cached[1]
+            else:
+                index_name = self._read_index_name(db_file)
+            index_names[db_file.name] = (signature, index_name)
+            databases.append({
+                'db_name': db_file.name,
+                'index_name': index_name
+            })
+
+        self._index_names = index_names
+        return sorted(databases, key=lambda x: x['index_name'])
+
+    @staticmethod
+    def _read_index_name(db_file: Path) -> str:
+        """Index name stored in a database file, or the file stem if it can't be read"""
+        try:
+            conn = sqlite3.connect(str(db_file))
             try:
-                # Try to extract index name from database
-                conn = sqlite3.connect(str(db_file))
                 cursor = conn.cursor()
                 cursor.execute("SELECT value FROM settings WHERE key = 'index_name'")
                 result = cursor.fetchone()
+            finally:
                 conn.close()
-
-                index_name = result[0] if result else db_file.stem
-                databases.append({
-                    'db_name': db_file.name,
-                    'index_name': index_name
-                })
-            except:
-                # If can't read index name, use filename
-                databases.append({
-                    'db_name': db_file.name,
-                    'index_name': db_file.stem
-                })
-
-        return sorted(databases, key=lambda x: x['index_name'])
+            return result[0] if result else db_file.stem
+        except sqlite3.Error:
+            return db_file.stem
 
     def validate_database(self, db_path: str) -> Tuple[bool, Optional[str], Optional[str]]:
         """
@@ -111,17 +196,52 @@ class DatabaseManager:
     def get_database(self, db_name: str) -> 'IndexDatabase':
         """Load and return database instance (with caching)"""
         # Check cache first
-        if db_name in self.cache:
-            return self.cache[db_name]
-
-        db_path = self.databases_dir / db_name
-
-        # Create database instance
-        db = IndexDatabase(str(db_path))
-        self.cache[db_name] = db
+        db = self.cache.get(db_name)
+        if db is not None:
+            return db
+
+        # Only one instance per database, even if several threads ask at once;
+        # each instance then keeps one connection per thread
+        with self._lock:
+            db = self.cache.get(db_name)
+            if db is None:
+                db = IndexDatabase(str(self.databases_dir / db_name))
+                self.cache[db_name] = db
 
         return db
 
+    def backup_snapshot(self, db_name: str) -> Path:
+        """
+        Path of a consistent copy of db_name for download, rewritten only after the database
+        changes, so repeat downloads keep the same file (and ETag, and Range support)
+        """
+        db = self.get_database(db_name)
+        snapshot_path = self.databases_dir / '.backups' / db_name
+        with self._snapshot_lock:
+            key = db.data_version()
+            if self._snapshots.get(db_name) != key or not snapshot_path.exists():
+                snapshot_path.parent.mkdir(exist_ok=True)
+                temp_path = snapshot_path.with_name(f"temp_{uuid.uuid4().hex}.db")
+                try:
+                    db.backup_to(temp_path)
+                    temp_path.replace(snapshot_path)
+                finally:
+                    temp_path.unlink(missing_ok=True)
+                self._snapshots[db_name] = key
+        return snapshot_path
+
+    def _drop_snapshot(self, db_name: str):
+        """Remove db_name's download snapshot, once the database is renamed or archived"""
+        with self._snapshot_lock:
+            self._snapshots.pop(db_name, None)
+            (self.databases_dir / '.backups' / db_name).unlink(missing_ok=True)
+
+    def close_all(self):
+        """Close every cached database's connections"""
+        with self._lock:
+            for db in self.cache.values():
+                db.close()
+
     def rename_database(self, old_db_name: str, new_index_name: str) -> Tuple[bool, str, Optional[str]]:
         """
         Rename a database file to match the new index name.
@@ -133,28 +253,19 @@ class DatabaseManager:
 
         # Generate new filename from index name
         new_db_name = sanitize_db_name(new_index_name)
-        new_path = self.databases_dir / new_db_name
 
         # If the filename hasn't changed, nothing to do
         if old_db_name == new_db_name:
             return True, old_db_name, None
 
-        # Check if target filename already exists
-        if new_path.exists():
-            # Try adding a number suffix to make it unique
-            base_name = new_db_name.replace('.db', '')
-            counter = 1
-            while new_path.exists() and counter < 100:
-                new_db_name = f"{base_name}_{counter}.db"
-                new_path = self.databases_dir / new_db_name
-                counter += 1
-
-            if new_path.exists():
-                return False, old_db_name, "Could not find unique filename"
+        # If the target filename already exists, add a number suffix to make it unique
+        new_db_name = self.unused_db_name(new_db_name, first_suffix=1)
+        new_path = self.databases_dir / new_db_name
 
         # Remove from cache if present (to release any file handles)
         if old_db_name in self.cache:
-            del self.cache[old_db_name]
+            self.cache.pop(old_db_name).close()
+        self._drop_snapshot(old_db_name)
 
         # Rename the file
         try:
@@ -164,16 +275,37 @@ class DatabaseManager:
 
         return True, new_db_name, None
 
+    def unused_db_name(self, db_name: str, first_suffix: int = 2) -> str:
+        """
+        db_name if no file in databases_dir has it, otherwise the first free
+        'name_N.db' from N = first_suffix; reads the directory once
+        """
+        existing = {path.name for path in self.databases_dir.iterdir()}
+        base_name = db_name.replace('.db', '')
+        counter = first_suffix
+        while db_name in existing:
+            db_name = f"{base_name}_{counter}.db"
+            counter += 1
+        return db_name
+
     def import_database(self, uploaded_file, filename: str) -> Tuple[bool, str, Optional[str]]:
         """
         Import uploaded .db file
         Returns: (success, db_name, error_message)
         """
-        # Save to temporary location
-        temp_path = self.databases_dir / f"temp_{filename}"
+        # Reject anything that isn't SQLite before writing it anywhere
+        stream = uploaded_file.stream
+        header = stream.read(len(SQLITE_HEADER))
+        if header != SQLITE_HEADER:
+            return False, None, "File is not a SQLite database"
+        stream.seek(0)
+
+        # Save to temporary location (named by us, not by the uploaded filename)
+        temp_path = self.databases_dir / f"temp_{uuid.uuid4().hex}.db"
 
         try:
-            uploaded_file.save(str(temp_path))
+            with open(temp_path, 'wb') as out:
+                shutil.copyfileobj(stream, out, length=1 << 20)
 
             # Validate database
             is_valid, index_name, error = self.validate_database(str(temp_path))
@@ -182,18 +314,10 @@ class DatabaseManager:
                 temp_path.unlink()  # Delete temp file
                 return False, None, error
 
-            # Generate final filename
-            db_name = sanitize_db_name(index_name)
+            # Generate final filename, with a suffix if it is taken
+            db_name = self.unused_db_name(sanitize_db_name(index_name))
             final_path = self.databases_dir / db_name
 
-            # Check if database already exists, add suffix if needed
-            counter = 2
-            while final_path.exists():
-                base_name = sanitize_db_name(index_name).replace('.db', '')
-                db_name = f"{base_name}_{counter}.db"
-                final_path = self.databases_dir / db_name
-                counter += 1
-
             # Move temp file to final location
             shutil.move(str(temp_path), str(final_path))
 
@@ -231,13 +355,14 @@ class DatabaseManager:
                 dest_path = archive_dir / archived_name
                 counter += 1
 
+            # Close and uncache it first so no open connection keeps the file or its WAL in use
+            if db_name in self.cache:
+                self.cache.pop(db_name).close()
+            self._drop_snapshot(db_name)
+
             # Move database to archive
             shutil.move(str(source_path), str(dest_path))
 
-            # Remove from cache if present
-            if db_name in self.cache:
-                del self.cache[db_name]
-
             return True, None
 
         except Exception as e:
@@ -247,12 +372,111 @@ class DatabaseManager:
 class IndexDatabase:
     def __init__(self, db_path: str = "book_index.db"):
         self.db_path = db_path
+        # One connection per thread, reused across calls (see _connect)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # thread ident -> (thread, connection)
+        # Incremented by every write method (@_mutates); cached reads are keyed on it
+        # together with the file signature (see data_version)
+        self.version = 0
+        self._entries_cache = None  # (data version, entries)
+        self._search_cache = None  # (data version, [lowered term], entries)
+        self._settings_cache = None  # (data version, {key: value})
         self.init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Get this thread's connection, opening it on first use
+        Used as `with self._connect() as conn:`, which commits or rolls back but leaves it open
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+
+            with self._lock:
+                # Close connections left behind by threads that have finished
+                for ident, (thread, old_conn) in list(self._connections.items()):
+                    if not thread.is_alive():
+                        old_conn.close()
+                        del self._connections[ident]
+                self._connections[threading.get_ident()] = (threading.current_thread(), conn)
+        return conn
+
+    def close(self):
+        """
+        Close every open connection to this database
+        Call before the file is moved or renamed; the next call reconnects
+        """
+        with self._lock:
+            for _, conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+            self._local = threading.local()
+
+    def data_version(self) -> Tuple:
+        """
+        Key for cached reads and ETags: changes with every write through this instance
+        (version) and with writes from other processes, e.g. the CLI (file signature)
+        """
+        return (self.version, _file_signature(Path(self.db_path)))
+
+    def checkpoint(self):
+        """Copy committed WAL content into the main database file (e.g. before copying it)"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
     
+    def connect_readonly(self) -> sqlite3.Connection:
+        """
+        Open a separate read-only connection, for long reads that shouldn't share the
+        thread's connection; under WAL it never blocks, or is blocked by, the writer
+        The caller closes it
+        """
+        uri = Path(self.db_path).absolute().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        # Same busy timeout, cache and mmap settings as the read-write connections
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.execute('PRAGMA query_only=ON')
+        return conn
+
+    def backup_to(self, dest_path):
+        """
+        Copy the database to dest_path with SQLite's online backup API
+        Reads one snapshot (WAL included), so writes during the copy can't tear it
+        """
+        src = self.connect_readonly()
+        try:
+            dest = sqlite3.connect(str(dest_path))
+            try:
+                src.backup(dest)
+            finally:
+                dest.close()
+        finally:
+            src.close()
+
+    def iterdump(self):
+        """
+        Yield the database as SQL statements, read from one consistent snapshot
+        Uses its own read-only connection so a long dump doesn't hold this thread's one open
+        """
+        conn = self.connect_readonly()
+        try:
+            conn.execute('BEGIN')
+            yield from conn.iterdump()
+        finally:
+            conn.close()
+
     def init_database(self):
         """Initialize the database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
+
+            # Write-ahead logging lets readers carry on while another connection writes
+            if self.db_path != ':memory:':
+                cursor.execute('PRAGMA journal_mode=WAL')
             
             # Create terms table
             cursor.execute('''
@@ -366,8 +590,7 @@ class IndexDatabase:
         Parse reference string in format b:p or b:p-p
         Returns (book_number, page_start, page_end)
         """
-        pattern = r'^(\d+):(\d+)(?:-(\d+))?$'
-        match = re.match(pattern, ref_str.strip())
+        match = REFERENCE_RE.match(ref_str.strip())
         
         if not match:
             raise ValueError(f"Invalid reference format: {ref_str}. Use b:p or b:p-p")
@@ -381,14 +604,16 @@ class IndexDatabase:
         
         return book, page_start, page_end
     
-    def add_entry(self, term: str, reference: str) -> bool:
+    @_mutates
+    def add_entry(self, term: str, reference: str, notes: Optional[str] = None) -> bool:
         """
-        Add an index entry
+        Add an index entry, and set the term's notes if given (even for a duplicate),
+        all in one transaction
         Returns True if added, False if duplicate
         """
         book, page_start, page_end = self.parse_reference(reference)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
             # Get or create term
@@ -401,69 +626,122 @@ class IndexDatabase:
                 cursor.execute('INSERT INTO terms (term) VALUES (?)', (term,))
                 term_id = cursor.lastrowid
 
+            if notes:
+                cursor.execute('UPDATE terms SET notes = ? WHERE id = ?', (notes, term_id))
+
             # Try to add reference
             try:
                 cursor.execute('''
                     INSERT INTO page_references (term_id, book_number, page_start, page_end)
                     VALUES (?, ?, ?, ?)
                 ''', (term_id, book, page_start, page_end))
-                conn.commit()
-
-                # Remove any gap exclusions that overlap with this reference
-                if page_end:
-                    # It's a range - remove exclusions for all pages in the range
-                    for page in range(page_start, page_end + 1):
-                        self.remove_exclusions_for_page(book, page)
-                else:
-                    # Single page
-                    self.remove_exclusions_for_page(book, page_start)
-
-                return True
             except sqlite3.IntegrityError:
                 # Duplicate reference
+                conn.commit()
                 return False
+
+            # Remove any gap exclusions that overlap with this reference (page or range)
+            cursor.execute('''
+                DELETE FROM gap_exclusions
+                WHERE book_number = ? AND page_start <= ? AND page_end >= ?
+            ''', (str(book), page_end or page_start, page_start))
+
+            conn.commit()
+            return True
     
+    @_mutates
+    def add_entries_bulk(self, entries: List[Tuple[str, int, int, Optional[int]]]) -> int:
+        """
+        Add many already-parsed entries in a single transaction
+        entries are (term, book, page_start, page_end) as returned by parse_reference
+        Returns the number added; the rest were duplicates
+        """
+        if not entries:
+            return 0
+
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            term_ids = {}
+            rows = []
+
+            for term, book, page_start, page_end in entries:
+                # Get or create term (same case-insensitive match as add_entry)
+                term_id = term_ids.get(term)
+                if term_id is None:
+                    cursor.execute('SELECT id FROM terms WHERE term = ? COLLATE NOCASE', (term,))
+                    result = cursor.fetchone()
+                    if result:
+                        term_id = result[0]
+                    else:
+                        cursor.execute('INSERT INTO terms (term) VALUES (?)', (term,))
+                        term_id = cursor.lastrowid
+                    term_ids[term] = term_id
+                rows.append((term_id, book, page_start, page_end))
+
+            # AUTOINCREMENT ids only grow, so the rows this insert added are those past the old max
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM page_references')
+            last_id = cursor.fetchone()[0]
+            cursor.executemany('''
+                INSERT OR IGNORE INTO page_references (term_id, book_number, page_start, page_end)
+                VALUES (?, ?, ?, ?)
+            ''', rows)
+            cursor.execute('''
+                SELECT CAST(book_number AS TEXT), COALESCE(page_end, page_start), page_start
+                FROM page_references WHERE id > ?
+            ''', (last_id,))
+            added = cursor.fetchall()
+
+            # Remove any gap exclusions that overlap the new references
+            cursor.executemany('''
+                DELETE FROM gap_exclusions
+                WHERE book_number = ? AND page_start <= ? AND page_end >= ?
+            ''', added)
+
+            conn.commit()
+            return len(added)
+
     def get_all_entries(self) -> List[Tuple[str, List[str]]]:
         """
         Get all index entries grouped by term
         Returns list of (term, [references])
+        The list is cached until the next write, so callers must not modify it
         """
-        with sqlite3.connect(self.db_path) as conn:
+        version = self.data_version()
+        cached = self._entries_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with self._connect() as conn:
             cursor = conn.cursor()
 
+            # References are formatted by SQLite ("b:p" or "b:p-p"); terms without any
+            # references have a NULL ref and are dropped
             cursor.execute('''
-                SELECT t.term, r.book_number, r.page_start, r.page_end
+                SELECT t.term,
+                       r.book_number || ':' || r.page_start
+                           || CASE WHEN r.page_end THEN '-' || r.page_end ELSE '' END
                 FROM terms t
                 LEFT JOIN page_references r ON t.id = r.term_id
                 ORDER BY t.term COLLATE NOCASE, r.book_number, r.page_start
             ''')
 
-            results = cursor.fetchall()
-
-            # Group by term
-            entries = {}
-            for term, book, page_start, page_end in results:
-                if term not in entries:
-                    entries[term] = []
-
-                if book is not None:  # Skip terms with no references
-                    if page_end:
-                        ref = f"{book}:{page_start}-{page_end}"
-                    else:
-                        ref = f"{book}:{page_start}"
-                    entries[term].append(ref)
-
-            # Remove terms with no references
-            entries = {k: v for k, v in entries.items() if v}
+            # Rows arrive grouped by term, so each term's references are one run
+            entries = []
+            for term, rows in itertools.groupby(cursor, key=itemgetter(0)):
+                references = [ref for _, ref in rows if ref is not None]
+                if references:
+                    entries.append((term, references))
 
-            return sorted(entries.items(), key=lambda x: x[0].lower())
+            entries.sort(key=lambda x: x[0].lower())
+            self._entries_cache = (version, entries)
+            return entries
 
     def get_recent_entries(self, limit: int = 5) -> List[Tuple[str, str, int]]:
         """
         Get most recently added entries
         Returns list of (term, reference, id) tuples, ordered by most recent first
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
             cursor.execute('''
@@ -487,12 +765,13 @@ class IndexDatabase:
 
             return entries
     
+    @_mutates
     def delete_entry(self, term: str, reference: Optional[str] = None) -> bool:
         """
         Delete an entry. If reference is None, delete all references for the term.
         Returns True if something was deleted
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # Get term ID
@@ -527,12 +806,13 @@ class IndexDatabase:
             conn.commit()
             return deleted
     
+    @_mutates
     def update_reference(self, term: str, old_reference: str, new_reference: str) -> bool:
         """
         Update a specific reference for a term
         Returns True if updated successfully
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # Get term ID
@@ -562,42 +842,56 @@ class IndexDatabase:
             conn.commit()
             return updated
     
-    def search_terms(self, pattern: str) -> List[Tuple[str, List[str]]]:
-        """Search for terms matching a pattern (case-insensitive)"""
-        with sqlite3.connect(self.db_path) as conn:
+    def _sorted_keys(self) -> Tuple[List[str], List[Tuple[str, List[str]]]]:
+        """
+        get_all_entries() with a parallel list of its lower-cased terms, which are in
+        sorted order; both are cached until the next write
+        """
+        version = self.data_version()
+        cached = self._search_cache
+        if cached is None or cached[0] != version:
+            # Lower-case every term once per version instead of per search
+            entries = self.get_all_entries()
+            cached = (version, [entry[0].lower() for entry in entries], entries)
+            self._search_cache = cached
+        return cached[1], cached[2]
+
+    def get_entries_page(self, limit: int,
+                         after_term: Optional[str] = None) -> List[Tuple[str, List[str]]]:
+        """
+        Get up to limit entries in get_all_entries() order, starting after after_term
+        (the last term of the previous page)
+        """
+        keys, entries = self._sorted_keys()
+        start = bisect.bisect_right(keys, after_term.lower()) if after_term else 0
+        return entries[start:start + limit]
+
+    def search_terms(self, pattern: str, limit: Optional[int] = None,
+                     after_term: Optional[str] = None) -> List[Tuple[str, List[str]]]:
+        """
+        Search for terms containing a pattern (case-insensitive)
+        limit / after_term page through the results like get_entries_page
+        """
+        keys, entries = self._sorted_keys()
+        needle = pattern.lower()
+        start = bisect.bisect_right(keys, after_term.lower()) if after_term else 0
+        matches = (entries[i] for i in range(start, len(keys)) if needle in keys[i])
+        return list(itertools.islice(matches, limit))
+
+    def get_term_names(self) -> List[str]:
+        """All terms in the index, including those with only notes"""
+        with self._connect() as conn:
             cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT t.term, r.book_number, r.page_start, r.page_end
-                FROM terms t
-                LEFT JOIN page_references r ON t.id = r.term_id
-                WHERE t.term LIKE ? COLLATE NOCASE
-                ORDER BY t.term COLLATE NOCASE, r.book_number, r.page_start
-            ''', (f'%{pattern}%',))
-            
-            results = cursor.fetchall()
-            
-            entries = {}
-            for term, book, page_start, page_end in results:
-                if term not in entries:
-                    entries[term] = []
-                
-                if book is not None:
-                    if page_end:
-                        ref = f"{book}:{page_start}-{page_end}"
-                    else:
-                        ref = f"{book}:{page_start}"
-                    entries[term].append(ref)
-            
-            entries = {k: v for k, v in entries.items() if v}
-            return sorted(entries.items(), key=lambda x: x[0].lower())
+            cursor.execute('SELECT term FROM terms')
+            return [term for term, in cursor]
 
+    @_mutates
     def update_notes(self, term: str, notes: str) -> bool:
         """
         Update notes for a term
         Returns True if updated successfully
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
             # Get or create term
@@ -614,20 +908,70 @@ class IndexDatabase:
             conn.commit()
             return True
 
-    def get_all_notes(self) -> List[Tuple[str, str]]:
+    @_mutates
+    def update_notes_bulk(self, notes: List[Tuple[str, str]]):
+        """
+        Set the notes of many (term, notes) pairs in a single transaction,
+        creating terms that don't exist yet (later pairs win, as with update_notes)
+        """
+        if not notes:
+            return
+
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            # term is UNIQUE COLLATE NOCASE, so the conflict matches case-insensitively
+            cursor.executemany('''
+                INSERT INTO terms (term, notes) VALUES (?, ?)
+                ON CONFLICT(term) DO UPDATE SET notes = excluded.notes
+            ''', notes)
+            conn.commit()
+
+    @_mutates
+    def fill_empty_notes(self, notes: List[Tuple[str, str]]) -> int:
+        """
+        Set the notes of existing terms that have none, from (term, notes) pairs, in a
+        single transaction; terms match case-insensitively, and unknown terms or terms
+        that already have notes are left alone
+        Returns the number of terms updated
+        """
+        if not notes:
+            return 0
+
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE terms SET notes = ?
+                WHERE term = ? AND (notes IS NULL OR notes = '')
+            ''', [(text, term) for term, text in notes])
+            updated = cursor.rowcount
+            conn.commit()
+            return updated
+
+    def get_all_notes(self, book_number: Optional[int] = None) -> List[Tuple[str, str]]:
         """
-        Get all terms with notes
+        Get all terms with notes, or only those with a reference in book_number
         Returns list of (term, notes) tuples, excluding empty notes
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
-            cursor.execute('''
-                SELECT term, notes
-                FROM terms
-                WHERE notes IS NOT NULL AND notes != ''
-                ORDER BY term COLLATE NOCASE
-            ''')
+            if book_number is None:
+                cursor.execute('''
+                    SELECT term, notes
+                    FROM terms
+                    WHERE notes IS NOT NULL AND notes != ''
+                    ORDER BY term COLLATE NOCASE
+                ''')
+            else:
+                # Probes the (term_id, book_number, ...) unique index once per noted term
+                cursor.execute('''
+                    SELECT term, notes
+                    FROM terms t
+                    WHERE notes IS NOT NULL AND notes != ''
+                      AND EXISTS (SELECT 1 FROM page_references r
+                                  WHERE r.term_id = t.id AND r.book_number = ?)
+                    ORDER BY term COLLATE NOCASE
+                ''', (book_number,))
 
             return cursor.fetchall()
 
@@ -636,7 +980,7 @@ class IndexDatabase:
         Get notes for a specific term
         Returns notes string or None if term doesn't exist
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
             cursor.execute('SELECT notes FROM terms WHERE term = ? COLLATE NOCASE', (term,))
@@ -644,12 +988,13 @@ class IndexDatabase:
 
             return result[0] if result else None
 
+    @_mutates
     def delete_notes(self, term: str) -> bool:
         """
         Delete notes for a term (sets to empty string)
         Returns True if successful
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
             cursor.execute('UPDATE terms SET notes = "" WHERE term = ? COLLATE NOCASE', (term,))
@@ -670,18 +1015,23 @@ class IndexDatabase:
     def get_setting(self, key: str) -> Optional[str]:
         """
         Get a setting value by key
-        """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
-            result = cursor.fetchone()
-            return result[0] if result else None
-
+        All settings are loaded together and cached until the next write
+        """
+        version = self.data_version()
+        cached = self._settings_cache
+        if cached is None or cached[0] != version:
+            with self._connect() as conn:
+                settings = dict(conn.execute('SELECT key, value FROM settings'))
+            cached = (version, settings)
+            self._settings_cache = cached
+        return cached[1].get(key)
+
+    @_mutates
     def set_setting(self, key: str, value: str) -> bool:
         """
         Set a setting value
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO settings (key, value) VALUES (?, ?)
@@ -690,23 +1040,25 @@ class IndexDatabase:
             conn.commit()
             return True
 
+    @_mutates
     def clear_all_data(self) -> bool:
         """
         Clear all entries and notes but keep settings and books
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM page_references')
             cursor.execute('DELETE FROM terms')
             conn.commit()
             return True
 
+    @_mutates
     def add_book(self, book_number: str, book_name: str, page_count: int) -> bool:
         """
         Add a new book
         Returns True if added, False if duplicate
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             try:
                 cursor.execute('''
@@ -723,7 +1075,7 @@ class IndexDatabase:
         Get all books
         Returns list of (book_number, book_name, page_count)
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT book_number, book_name, page_count
@@ -732,12 +1084,13 @@ class IndexDatabase:
             ''')
             return cursor.fetchall()
 
+    @_mutates
     def update_book(self, old_number: str, book_number: str, book_name: str, page_count: int) -> bool:
         """
         Update a book
         Returns True if updated successfully
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE books
@@ -748,12 +1101,63 @@ class IndexDatabase:
             conn.commit()
             return updated
 
+    @_mutates
+    def apply_book_changes(self, add: List[Tuple[str, str, int]],
+                           update: List[Tuple[str, str, str, int]],
+                           delete: List[str]) -> Tuple[int, int, int]:
+        """
+        Delete, update and add many books in one transaction (in that order, so a
+        deleted number can be reused); all or nothing if any statement fails
+        add: (book_number, book_name, page_count); existing numbers are skipped
+        update: (old_number, book_number, book_name, page_count)
+        delete: book numbers, removed with their references, exclusions and properties
+        Returns (added, updated, deleted) counts
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+
+            deleted = 0
+            if delete:
+                cursor.executemany('DELETE FROM page_references WHERE book_number = ?',
+                                   [(int(number),) for number in delete])
+                numbers = [(number,) for number in delete]
+                cursor.executemany('DELETE FROM gap_exclusions WHERE book_number = ?', numbers)
+                cursor.executemany('DELETE FROM book_custom_properties WHERE book_number = ?', numbers)
+                cursor.executemany('DELETE FROM books WHERE book_number = ?', numbers)
+                deleted = cursor.rowcount
+                # Clean up orphaned terms once for all the deleted books
+                cursor.execute('''
+                    DELETE FROM terms
+                    WHERE id NOT IN (SELECT DISTINCT term_id FROM page_references)
+                    AND (notes IS NULL OR notes = '')
+                ''')
+
+            updated = 0
+            if update:
+                cursor.executemany('''
+                    UPDATE books
+                    SET book_number = ?, book_name = ?, page_count = ?
+                    WHERE book_number = ?
+                ''', [(number, name, pages, old) for old, number, name, pages in update])
+                updated = cursor.rowcount
+
+            added = 0
+            if add:
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO books (book_number, book_name, page_count)
+                    VALUES (?, ?, ?)
+                ''', add)
+                added = cursor.rowcount
+
+            conn.commit()
+            return added, updated, deleted
+
     def get_book_reference_count(self, book_number: str) -> Tuple[int, int]:
         """
         Get count of references and exclusions for a book
         Returns (reference_count, exclusion_count)
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
             # Count page references
@@ -772,12 +1176,13 @@ class IndexDatabase:
 
             return (ref_count, exclusion_count)
 
+    @_mutates
     def delete_book(self, book_number: str) -> bool:
         """
         Delete a book and all associated references and exclusions
         Returns True if deleted
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
             # Delete all page references for this book
@@ -811,105 +1216,95 @@ class IndexDatabase:
         Perform gap analysis for all books
         Returns list of (book_number, book_name, page_count, [gap_ranges], [excluded_ranges], term_count)
         """
+        return list(self.iter_gap_analysis())
+
+    def iter_gap_analysis(self) -> Iterator[Tuple[str, str, int, List[str], List[str], int]]:
+        """Gap analysis one book at a time, yielding the same tuples as get_gap_analysis"""
         books = self.get_all_books()
-        results = []
+        # Only pages 1..page_count matter; clamping to it keeps a stray page number in
+        # one reference (e.g. 1:200000000) from making every bitmap huge
+        page_counts = {int(book_number): page_count for book_number, _, page_count in books
+                       if page_count and page_count > 0}
+
+        # Fetch references, term counts and exclusions for all books in three grouped
+        # queries rather than three queries per book
+        referenced = {}  # book_number -> covered pages as bits of one int (bit n = page n)
+        exclusions = {}
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT DISTINCT r.book_number, r.page_start, r.page_end
+                FROM page_references r
+                JOIN terms t ON r.term_id = t.id
+            ''')
+            for book, page_start, page_end in cursor:
+                page_count = page_counts.get(book)
+                if page_count is None or page_start > page_count:
+                    continue
+                page_end = min(page_end or page_start, page_count)
+                referenced[book] = referenced.get(book, 0) | _page_bits(page_start, page_end)
+
+            cursor.execute('''
+                SELECT r.book_number, COUNT(DISTINCT r.term_id)
+                FROM page_references r
+                JOIN terms t ON r.term_id = t.id
+                GROUP BY r.book_number
+            ''')
+            term_counts = dict(cursor.fetchall())
+
+            cursor.execute('''
+                SELECT book_number, page_start, page_end
+                FROM gap_exclusions
+                ORDER BY book_number, page_start, page_end
+            ''')
+            for book, rows in itertools.groupby(cursor, key=itemgetter(0)):
+                exclusions[book] = [(page_start, page_end) for _, page_start, page_end in rows]
 
         for book_number, book_name, page_count in books:
             if not page_count or page_count <= 0:
                 # Include book but with empty gap analysis data
-                results.append((book_number, book_name, 0, [], [], 0))
+                yield (book_number, book_name, 0, [], [], 0)
                 continue
 
-            # Get all references for this book
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT DISTINCT r.page_start, r.page_end
-                    FROM page_references r
-                    JOIN terms t ON r.term_id = t.id
-                    WHERE r.book_number = ?
-                    ORDER BY r.page_start
-                ''', (int(book_number),))
-
-                references = cursor.fetchall()
+            covered = referenced.get(int(book_number), 0)
+            term_count = term_counts.get(int(book_number), 0)
 
-                # Get count of distinct terms for this book
-                cursor.execute('''
-                    SELECT COUNT(DISTINCT t.term)
-                    FROM page_references r
-                    JOIN terms t ON r.term_id = t.id
-                    WHERE r.book_number = ?
-                ''', (int(book_number),))
-
-                term_count = cursor.fetchone()[0]
-
-            # Build set of all referenced pages
-            referenced_pages = set()
-            for page_start, page_end in references:
-                if page_end:
-                    # It's a range
-                    for page in range(page_start, page_end + 1):
-                        referenced_pages.add(page)
-                else:
-                    # Single page
-                    referenced_pages.add(page_start)
-
-            # Get excluded pages for this book
-            exclusions = self.get_gap_exclusions(book_number)
-            excluded_pages = set()
-            for page_start, page_end in exclusions:
-                for page in range(page_start, page_end + 1):
-                    excluded_pages.add(page)
+            # Excluded pages count as covered
+            book_exclusions = exclusions.get(book_number, [])
+            for page_start, page_end in book_exclusions:
+                covered |= _page_bits(page_start, min(page_end, page_count))
 
             # Find gaps (pages not referenced and not excluded)
-            gaps = []
-            for page in range(1, page_count + 1):
-                if page not in referenced_pages and page not in excluded_pages:
-                    gaps.append(page)
-
-            # Consolidate consecutive gaps into ranges
+            free = _page_bits(1, page_count) & ~covered
             gap_ranges = []
-            if gaps:
-                range_start = gaps[0]
-                range_end = gaps[0]
-
-                for i in range(1, len(gaps)):
-                    if gaps[i] == range_end + 1:
-                        # Consecutive, extend the range
-                        range_end = gaps[i]
-                    else:
-                        # Gap in sequence, save current range and start new one
-                        if range_start == range_end:
-                            gap_ranges.append(str(range_start))
-                        else:
-                            gap_ranges.append(f"{range_start}-{range_end}")
-                        range_start = gaps[i]
-                        range_end = gaps[i]
-
-                # Add the last range
+            while free:
+                range_start = (free & -free).bit_length() - 1
+                run = free >> range_start
+                run_length = (~run & (run + 1)).bit_length() - 1
+                range_end = range_start + run_length - 1
                 if range_start == range_end:
                     gap_ranges.append(str(range_start))
                 else:
                     gap_ranges.append(f"{range_start}-{range_end}")
+                free &= ~_page_bits(range_start, range_end)
 
             # Format excluded ranges for display
             excluded_ranges = []
-            for page_start, page_end in exclusions:
+            for page_start, page_end in book_exclusions:
                 if page_start == page_end:
                     excluded_ranges.append(str(page_start))
                 else:
                     excluded_ranges.append(f"{page_start}-{page_end}")
 
-            results.append((book_number, book_name, page_count, gap_ranges, excluded_ranges, term_count))
-
-        return results
+            yield (book_number, book_name, page_count, gap_ranges, excluded_ranges, term_count)
 
+    @_mutates
     def add_gap_exclusion(self, book_number: str, page_start: int, page_end: int) -> bool:
         """
         Add a gap exclusion (pages to ignore in gap analysis)
         Returns True if added, False if duplicate
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             try:
                 cursor.execute('''
@@ -921,12 +1316,13 @@ class IndexDatabase:
             except sqlite3.IntegrityError:
                 return False
 
+    @_mutates
     def remove_gap_exclusion(self, book_number: str, page_start: int, page_end: int) -> bool:
         """
         Remove a gap exclusion
         Returns True if deleted
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 DELETE FROM gap_exclusions
@@ -941,7 +1337,7 @@ class IndexDatabase:
         Get all gap exclusions for a book
         Returns list of (page_start, page_end) tuples
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT page_start, page_end
@@ -951,12 +1347,13 @@ class IndexDatabase:
             ''', (book_number,))
             return cursor.fetchall()
 
+    @_mutates
     def remove_exclusions_for_page(self, book_number: int, page: int) -> int:
         """
         Remove any exclusions that contain the given page
         Returns number of exclusions removed
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 DELETE FROM gap_exclusions
@@ -966,12 +1363,13 @@ class IndexDatabase:
             conn.commit()
             return removed
 
+    @_mutates
     def add_custom_property(self, property_name: str, property_value: str) -> int:
         """
         Add a new custom property
         Returns the ID of the added property
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             # Get the next display order
             cursor.execute('SELECT COALESCE(MAX(display_order), -1) + 1 FROM custom_properties')
@@ -989,7 +1387,7 @@ class IndexDatabase:
         Get all custom properties ordered by display_order
         Returns list of (id, property_name, property_value, display_order) tuples
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, property_name, property_value, display_order
@@ -998,12 +1396,13 @@ class IndexDatabase:
             ''')
             return cursor.fetchall()
 
+    @_mutates
     def update_custom_property(self, property_id: int, property_name: str, property_value: str) -> bool:
         """
         Update an existing custom property
         Returns True if updated, False if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE custom_properties
@@ -1013,23 +1412,25 @@ class IndexDatabase:
             conn.commit()
             return cursor.rowcount > 0
 
+    @_mutates
     def delete_custom_property(self, property_id: int) -> bool:
         """
         Delete a custom property
         Returns True if deleted, False if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM custom_properties WHERE id = ?', (property_id,))
             conn.commit()
             return cursor.rowcount > 0
 
+    @_mutates
     def reorder_custom_properties(self, property_ids: List[int]) -> bool:
         """
         Reorder custom properties based on the provided list of IDs
         The order in the list determines the new display_order
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             for order, property_id in enumerate(property_ids):
                 cursor.execute('''
@@ -1041,12 +1442,13 @@ class IndexDatabase:
             return True
 
     # Book Custom Properties Methods
+    @_mutates
     def add_book_custom_property(self, book_number: int, property_name: str, property_value: str) -> int:
         """
         Add a custom property for a specific book
         Returns the ID of the added property
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             # Get the next display order for this book
             cursor.execute(
@@ -1067,7 +1469,7 @@ class IndexDatabase:
         Get all custom properties for a specific book ordered by display_order
         Returns list of (id, property_name, property_value, display_order) tuples
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, property_name, property_value, display_order
@@ -1077,12 +1479,35 @@ class IndexDatabase:
             ''', (book_number,))
             return cursor.fetchall()
 
+    def get_books_with_properties(self) -> List[Tuple[str, str, int, List[Tuple[str, str]]]]:
+        """
+        All books with their custom properties, in one query
+        Returns list of (book_number, book_name, page_count, [(property_name, property_value)])
+        in get_all_books order, properties in display order
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT b.id, b.book_number, b.book_name, b.page_count, p.property_name, p.property_value
+                FROM books b
+                LEFT JOIN book_custom_properties p ON p.book_number = b.book_number
+                ORDER BY b.book_number, p.display_order, p.id
+            ''')
+            books = []
+            for _, rows in itertools.groupby(cursor, key=itemgetter(0)):
+                rows = list(rows)
+                _, book_number, book_name, page_count, name, _ = rows[0]
+                properties = [(row[4], row[5]) for row in rows] if name is not None else []
+                books.append((book_number, book_name, page_count, properties))
+            return books
+
+    @_mutates
     def update_book_custom_property(self, property_id: int, property_name: str, property_value: str) -> bool:
         """
         Update a book custom property
         Returns True if updated, False if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE book_custom_properties
@@ -1092,22 +1517,24 @@ class IndexDatabase:
             conn.commit()
             return cursor.rowcount > 0
 
+    @_mutates
     def delete_book_custom_property(self, property_id: int) -> bool:
         """
         Delete a book custom property
         Returns True if deleted, False if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM book_custom_properties WHERE id = ?', (property_id,))
             conn.commit()
             return cursor.rowcount > 0
 
+    @_mutates
     def reorder_book_custom_properties(self, book_number: int, property_ids: List[int]) -> bool:
         """
         Reorder custom properties for a book based on the provided list of IDs
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             for order, property_id in enumerate(property_ids):
                 cursor.execute('''
@@ -1118,11 +1545,12 @@ class IndexDatabase:
             conn.commit()
             return True
 
+    @_mutates
     def delete_book_custom_properties(self, book_number: int) -> bool:
         """
         Delete all custom properties for a book (used when deleting a book)
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM book_custom_properties WHERE book_number = ?', (book_number,))
             conn.commit()
@@ -1133,7 +1561,7 @@ class IndexDatabase:
         Get all terms for AI enrichment
         Returns list of (id, term, ai_description, is_tool) tuples
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, term, ai_description, is_tool
@@ -1147,7 +1575,7 @@ class IndexDatabase:
         Get terms that haven't been enriched yet
         Returns list of (id, term) tuples
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, term
@@ -1162,7 +1590,7 @@ class IndexDatabase:
         Get terms that don't have notes
         Returns list of (id, term) tuples
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, term
@@ -1172,12 +1600,13 @@ class IndexDatabase:
             ''')
             return cursor.fetchall()
 
+    @_mutates
     def update_term_ai_data(self, term_id: int, description: str, is_tool: bool) -> bool:
         """
         Update AI enrichment data for a term
         Returns True if updated successfully
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE terms
@@ -1187,12 +1616,35 @@ class IndexDatabase:
             conn.commit()
             return cursor.rowcount > 0
 
+    @_mutates
+    def update_terms_ai_data_bulk(self, rows: List[Tuple[str, str, bool]]) -> int:
+        """
+        Update AI enrichment data for many (term, description, is_tool) rows in a single
+        transaction; terms match case-insensitively and unknown ones are skipped
+        Returns the number of rows updated
+        """
+        if not rows:
+            return 0
+
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            # term is UNIQUE COLLATE NOCASE, so each lookup is a case-insensitive index search
+            cursor.executemany('''
+                UPDATE terms
+                SET ai_description = ?, is_tool = ?, ai_enriched_at = CURRENT_TIMESTAMP
+                WHERE term = ?
+            ''', [(description, 1 if is_tool else 0, term) for term, description, is_tool in rows])
+            updated = cursor.rowcount
+            conn.commit()
+            return updated
+
+    @_mutates
     def clear_term_ai_data(self, term_id: int) -> bool:
         """
         Clear AI enrichment data for a term
         Returns True if updated successfully
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE terms
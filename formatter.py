@@ -1,8 +1,244 @@
 """
 LaTeX-style index formatter
 """
+import re
 from typing import List, Tuple
 from datetime import datetime
+from functools import lru_cache
+from io import StringIO
+from itertools import groupby
+
+
+@lru_cache(maxsize=32)
+def _render_front_matter(style: str, books: tuple, properties: tuple) -> Tuple[str, ...]:
+    """
+    Render the Books / Properties front-matter block for a text format.
+    Keyed on the metadata content, so exporting the same index in several
+    formats renders each block once.
+    """
+    escape = IndexFormatter.escape_latex
+    lines = []
+
+    if books:
+        if style == 'latex':
+            lines.append("\\textbf{Books:}\\\\[0.5cm]")
+        elif style == 'markdown':
+            lines.extend(["## Books", ""])
+        else:
+            lines.extend(["Books:", "-" * 60])
+        for book_number, book_name, page_count in books:
+            page_info = f" ({page_count} pages)" if page_count else ""
+            if style == 'latex':
+                lines.append(f"Book {book_number}: {escape(book_name)}{page_info}\\\\")
+            elif style == 'markdown':
+                lines.append(f"- **Book {book_number}**: {book_name}{page_info}")
+            else:
+                lines.append(f"  Book {book_number}: {book_name}{page_info}")
+        lines.append("\\vspace{1cm}" if style == 'latex' else "")
+
+    if properties:
+        if style == 'latex':
+            lines.append("\\textbf{Properties:}\\\\[0.5cm]")
+        elif style == 'markdown':
+            lines.extend(["## Properties", ""])
+        else:
+            lines.extend(["Properties:", "-" * 60])
+        for name, value in properties:
+            if style == 'latex':
+                lines.append(f"{escape(name)}: {escape(value)}\\\\")
+            elif style == 'markdown':
+                lines.append(f"- **{name}**: {value}")
+            else:
+                lines.append(f"  {name}: {value}")
+        lines.append("\\vspace{1cm}" if style == 'latex' else "")
+
+    return tuple(lines)
+
+
+# Letter group for each ASCII code point: 'A'-'Z' for letters, '#' for everything else
+_ASCII_BUCKET = bytes(ord(chr(i).upper()) if chr(i).isalpha() else ord('#') for i in range(128))
+
+
+def _first_letter(text: str) -> str:
+    """IndexFormatter.normalize_first_letter"""
+    if not text:
+        return '#'
+
+    # ASCII is a single table lookup
+    code = ord(text[0])
+    if code < 128:
+        return chr(_ASCII_BUCKET[code])
+    return _non_ascii_letter(text[0])
+
+
+@lru_cache(maxsize=4096)
+def _non_ascii_letter(char: str) -> str:
+    """Letter group for one non-ASCII first character (cached per character, not per term)"""
+    first_char = char.upper()
+
+    # Check if it's a letter
+    if first_char.isalpha() and first_char.isupper():
+        return first_char
+
+    # Everything else (numbers, special characters) becomes "#"
+    return '#'
+
+
+def _prepare_sorted(items: list, hash_last: bool = False) -> list:
+    """
+    Sort (term, ...) tuples by letter group then case-insensitive term
+    The "#" group goes first unless hash_last is set. Keys are computed once
+    per item and compared as plain tuples; the index keeps the sort stable.
+    """
+    decorated = []
+    for i, item in enumerate(items):
+        term = item[0]
+        is_hash = _first_letter(term) == '#'
+        decorated.append((is_hash if hash_last else not is_hash, term.lower(), i, item))
+    decorated.sort()
+    return [d[3] for d in decorated]
+
+
+# LaTeX special characters and their escaped forms
+_LATEX_ESCAPES = {
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}',
+    '\\': r'\textbackslash{}',
+}
+
+# Note bodies: escapes plus a \par after each blank line, applied in one regex pass
+_LATEX_NOTE_REPLACEMENTS = {**_LATEX_ESCAPES, '\n\n': '\n\n\\par\n'}
+_LATEX_NOTE_RE = re.compile(r'[&%$#_{}~^\\]|\n\n')
+
+
+def _group_by_letter(items: list):
+    """
+    Group already-sorted (term, ...) tuples into (letter, group) runs
+    Each key is a table lookup (or a per-character cache hit for non-ASCII terms)
+    """
+    return groupby(items, key=lambda item: _first_letter(item[0]))
+
+
+def _stream_text(head: list, sections, tail: list):
+    """
+    Yield the text of "\n".join(head + ["\n\n".join(sections)] + tail) piece by piece,
+    one letter section at a time, so a large export never has to be one string
+    """
+    yield "\n".join(head) + "\n"
+    separator = ""
+    for section in sections:
+        yield separator + section
+        separator = "\n\n"
+    if tail:
+        yield "\n" + "\n".join(tail)
+
+
+def _drain(buf: StringIO) -> str:
+    """Return what has been written to buf and empty it for reuse"""
+    text = buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+    return text
+
+
+@lru_cache(maxsize=1)
+def _openpyxl_styles() -> dict:
+    """
+    Shared openpyxl style objects for the Excel writers, built once
+    Raises ImportError if openpyxl is not installed
+    """
+    from openpyxl.styles import Font, Alignment, PatternFill
+
+    return {
+        'title_font': Font(size=16, bold=True),
+        'section_font': Font(size=12, bold=True),
+        'header_font': Font(bold=True),
+        'header_fill': PatternFill(start_color="E2E8F0", end_color="E2E8F0", fill_type="solid"),
+        'letter_font': Font(size=14, bold=True),
+        'letter_fill': PatternFill(start_color="F1F5F9", end_color="F1F5F9", fill_type="solid"),
+        'wrap': Alignment(wrap_text=True, vertical='top'),
+    }
+
+
+@lru_cache(maxsize=8)
+def _pdf_styles(accent_color: str) -> dict:
+    """
+    ReportLab paragraph and table styles for the PDF writers, built once per accent colour
+    Raises ImportError if reportlab is not installed
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.platypus import TableStyle
+
+    styles = getSampleStyleSheet()
+    accent = colors.HexColor(accent_color)
+    grey = colors.HexColor('#666666')
+
+    return {
+        # Front page
+        'title': ParagraphStyle('TitleStyle', parent=styles['Title'], fontSize=24, textColor=accent,
+                                spaceAfter=12, alignment=TA_CENTER, fontName='Helvetica-Bold'),
+        'subtitle': ParagraphStyle('SubtitleStyle', parent=styles['Normal'], fontSize=16,
+                                   alignment=TA_CENTER, textColor=grey),
+        'date': ParagraphStyle('DateStyle', parent=styles['Normal'], fontSize=10,
+                               alignment=TA_CENTER, textColor=grey),
+        'front_heading': ParagraphStyle('FrontHeadingStyle', parent=styles['Heading2'], fontSize=14,
+                                        textColor=accent, spaceAfter=8, spaceBefore=12,
+                                        fontName='Helvetica-Bold'),
+        'front_content': ParagraphStyle('FrontContentStyle', parent=styles['Normal'], fontSize=11,
+                                        spaceAfter=6, leftIndent=20),
+        'book_metadata': ParagraphStyle('BookMetadataStyle', parent=styles['Normal'], fontSize=9,
+                                        spaceAfter=2, leftIndent=20, textColor=grey),
+        # Letter headings (larger and bold, on a grey table background)
+        'letter_heading': ParagraphStyle('LetterHeading', parent=styles['Heading1'], fontSize=14,
+                                         textColor=accent, spaceAfter=8, spaceBefore=12,
+                                         fontName='Helvetica-Bold', keepWithNext=True),
+        'letter_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f1f5f9')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ]),
+        # Index entries (term in bold, references in normal)
+        'entry': ParagraphStyle('EntryStyle', parent=styles['Normal'], fontSize=9, leftIndent=10,
+                                spaceAfter=4, leading=11),
+        # Rows of an index entries table; bottom padding stands in for the entry spaceAfter
+        'entry_table': TableStyle([
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ]),
+        # Notes
+        'term': ParagraphStyle('TermStyle', parent=styles['Heading2'], fontSize=12, textColor=accent,
+                               spaceAfter=6, spaceBefore=10, fontName='Helvetica-Bold',
+                               keepWithNext=True),
+        'notes': ParagraphStyle('NotesStyle', parent=styles['Normal'], fontSize=9, leftIndent=10,
+                                spaceAfter=12, leading=12),
+    }
+
+
+def _styled_cell(ws, value, font=None, fill=None, alignment=None):
+    """Build a write-only cell with the given shared style objects"""
+    from openpyxl.cell import WriteOnlyCell
+
+    cell = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if alignment is not None:
+        cell.alignment = alignment
+    return cell
 
 
 class IndexFormatter:
@@ -16,31 +252,40 @@ class IndexFormatter:
         Numbers and special characters become "#"
         Letters A-Z remain as uppercase letters
         """
-        if not text or len(text) == 0:
-            return '#'
-
-        first_char = text[0].upper()
+        return _first_letter(text)
 
-        # Check if it's a letter A-Z
-        if first_char.isalpha() and first_char.isupper():
-            return first_char
-
-        # Everything else (numbers, special characters) becomes "#"
-        return '#'
+    @staticmethod
+    def _front_matter(style: str, metadata: dict) -> Tuple[str, ...]:
+        """
+        Get the rendered Books / Properties lines for a text format
+        style is one of 'latex', 'plain' or 'markdown'
+        """
+        books = tuple((b['book_number'], b['book_name'], b['page_count'])
+                      for b in metadata['books'])
+        properties = tuple((p['name'], p['value']) for p in metadata['custom_properties'])
+        return _render_front_matter(style, books, properties)
 
     def format_latex_style(self, entries: List[Tuple[str, List[str]]],
                            metadata: dict = None) -> str:
         """
         Format index entries in LaTeX style
         """
+        return "".join(self.iter_latex_style(entries, metadata))
+
+    def iter_latex_style(self, entries: List[Tuple[str, List[str]]],
+                         metadata: dict = None):
+        """
+        Format index entries in LaTeX style, yielding the text in chunks
+        """
         if metadata is None:
             metadata = {'index_name': 'Index', 'books': [], 'custom_properties': []}
 
         output = []
+        now = datetime.now()
 
         # Add header
         output.append(f"% {metadata['index_name']}")
-        output.append(f"% Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        output.append(f"% Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}")
         output.append("")
 
         # Front page
@@ -52,74 +297,48 @@ class IndexFormatter:
         output.append("\\vspace{2cm}")
         output.append("")
 
-        # Books
-        if metadata['books']:
-            output.append("\\textbf{Books:}\\\\[0.5cm]")
-            for book in metadata['books']:
-                page_info = f" ({book['page_count']} pages)" if book['page_count'] else ""
-                output.append(f"Book {book['book_number']}: {self.escape_latex(book['book_name'])}{page_info}\\\\")
-            output.append("\\vspace{1cm}")
-
-        # Custom properties
-        if metadata['custom_properties']:
-            output.append("\\textbf{Properties:}\\\\[0.5cm]")
-            for prop in metadata['custom_properties']:
-                output.append(f"{self.escape_latex(prop['name'])}: {self.escape_latex(prop['value'])}\\\\")
-            output.append("\\vspace{1cm}")
+        # Books and custom properties
+        output.extend(self._front_matter('latex', metadata))
 
         output.append("\\vfill")
-        output.append(f"{{\\small Generated: {datetime.now().strftime('%Y-%m-%d')}}}")
+        output.append(f"{{\\small Generated: {now.strftime('%Y-%m-%d')}}}")
         output.append("\\end{titlepage}")
         output.append("")
 
         if not entries:
             output.append("% Empty index")
-            return "\n".join(output)
+            yield "\n".join(output)
+            return
 
         output.append("\\begin{theindex}")
         output.append("")
 
-        # Sort entries with "#" (special chars/numbers) at the end
-        def sort_key(item):
-            term = item[0]
-            first_letter = self.normalize_first_letter(term)
-            return (first_letter != '#', term.lower())
-
-        entries = sorted(entries, key=sort_key)
-
-        current_letter = None
-
-        for term, references in entries:
-            # Get first letter (normalize special chars and numbers to "#")
-            first_letter = self.normalize_first_letter(term)
-
-            # Add letter heading if new letter
-            if first_letter != current_letter:
-                if current_letter is not None:
-                    output.append("")  # Blank line between letter sections
-                output.append(f"  \\indexspace")
-                output.append(f"  \\textbf{{{first_letter}}}")
-                output.append("")
-                current_letter = first_letter
-
-            # Format references
-            ref_str = ", ".join(references)
+        # Sort entries with "#" (special chars/numbers) first
+        entries = _prepare_sorted(entries)
 
-            # Escape special LaTeX characters in term
-            escaped_term = self.escape_latex(term)
+        # One block per letter section (special chars and numbers grouped under "#"),
+        # separated by a blank line
+        sections = (
+            f"  \\indexspace\n  \\textbf{{{first_letter}}}\n\n"
+            + "\n".join([f"  \\item {self.escape_latex(term)}, {', '.join(references)}"
+                         for term, references in group])
+            for first_letter, group in _group_by_letter(entries)
+        )
 
-            output.append(f"  \\item {escaped_term}, {ref_str}")
-
-        output.append("")
-        output.append("\\end{theindex}")
-
-        return "\n".join(output)
+        yield from _stream_text(output, sections, ["", "\\end{theindex}"])
 
     def format_plain_text(self, entries: List[Tuple[str, List[str]]],
                           metadata: dict = None) -> str:
         """
         Format index entries as plain text with letter headings
         """
+        return "".join(self.iter_plain_text(entries, metadata))
+
+    def iter_plain_text(self, entries: List[Tuple[str, List[str]]],
+                        metadata: dict = None):
+        """
+        Format index entries as plain text, yielding the text in chunks
+        """
         if metadata is None:
             metadata = {'index_name': 'Index', 'books': [], 'custom_properties': []}
 
@@ -133,22 +352,8 @@ class IndexFormatter:
         output.append("=" * 60)
         output.append("")
 
-        # Books section
-        if metadata['books']:
-            output.append("Books:")
-            output.append("-" * 60)
-            for book in metadata['books']:
-                page_info = f" ({book['page_count']} pages)" if book['page_count'] else ""
-                output.append(f"  Book {book['book_number']}: {book['book_name']}{page_info}")
-            output.append("")
-
-        # Custom properties section
-        if metadata['custom_properties']:
-            output.append("Properties:")
-            output.append("-" * 60)
-            for prop in metadata['custom_properties']:
-                output.append(f"  {prop['name']}: {prop['value']}")
-            output.append("")
+        # Books and custom properties sections
+        output.extend(self._front_matter('plain', metadata))
 
         output.append("=" * 60)
         output.append("INDEX".center(60))
@@ -161,50 +366,41 @@ class IndexFormatter:
             output.append("=" * 60)
             output.append(f"Created with Page Sage  •  {metadata['index_name']}".center(60))
             output.append("=" * 60)
-            return "\n".join(output)
-
-        # Sort entries with "#" (special chars/numbers) at the end
-        def sort_key(item):
-            term = item[0]
-            first_letter = self.normalize_first_letter(term)
-            return (first_letter != '#', term.lower())
-
-        entries = sorted(entries, key=sort_key)
-
-        current_letter = None
-
-        for term, references in entries:
-            # Get first letter (normalize special chars and numbers to "#")
-            first_letter = self.normalize_first_letter(term)
-
-            # Add letter heading if new letter
-            if first_letter != current_letter:
-                if current_letter is not None:
-                    output.append("")  # Blank line between letter sections
-                output.append(f"{first_letter}")
-                output.append("-" * 40)
-                current_letter = first_letter
-
-            # Format references
-            ref_str = ", ".join(references)
-
-            output.append(f"  {term}: {ref_str}")
-
-        output.append("")
-        output.append("=" * 60)
-        output.append(f"Total entries: {len(entries)}")
-        output.append("=" * 60)
-        output.append("")
-        output.append(f"Created with Page Sage  •  {metadata['index_name']}".center(60))
-        output.append("=" * 60)
-
-        return "\n".join(output)
+            yield "\n".join(output)
+            return
+
+        # Sort entries with "#" (special chars/numbers) first
+        entries = _prepare_sorted(entries)
+
+        # One block per letter section, separated by a blank line
+        sections = (
+            f"{first_letter}\n{'-' * 40}\n"
+            + "\n".join([f"  {term}: {', '.join(references)}" for term, references in group])
+            for first_letter, group in _group_by_letter(entries)
+        )
+
+        yield from _stream_text(output, sections, [
+            "",
+            "=" * 60,
+            f"Total entries: {len(entries)}",
+            "=" * 60,
+            "",
+            f"Created with Page Sage  •  {metadata['index_name']}".center(60),
+            "=" * 60,
+        ])
 
     def format_markdown(self, entries: List[Tuple[str, List[str]]],
                         metadata: dict = None) -> str:
         """
         Format index entries as Markdown
         """
+        return "".join(self.iter_markdown(entries, metadata))
+
+    def iter_markdown(self, entries: List[Tuple[str, List[str]]],
+                      metadata: dict = None):
+        """
+        Format index entries as Markdown, yielding the text in chunks
+        """
         if metadata is None:
             metadata = {'index_name': 'Index', 'books': [], 'custom_properties': []}
 
@@ -216,22 +412,8 @@ class IndexFormatter:
         output.append(f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
         output.append("")
 
-        # Books
-        if metadata['books']:
-            output.append("## Books")
-            output.append("")
-            for book in metadata['books']:
-                page_info = f" ({book['page_count']} pages)" if book['page_count'] else ""
-                output.append(f"- **Book {book['book_number']}**: {book['book_name']}{page_info}")
-            output.append("")
-
-        # Custom properties
-        if metadata['custom_properties']:
-            output.append("## Properties")
-            output.append("")
-            for prop in metadata['custom_properties']:
-                output.append(f"- **{prop['name']}**: {prop['value']}")
-            output.append("")
+        # Books and custom properties
+        output.extend(self._front_matter('markdown', metadata))
 
         output.append("---")
         output.append("")
@@ -243,47 +425,32 @@ class IndexFormatter:
             output.append("")
             output.append("---")
             output.append(f"*Created with Page Sage  •  {metadata['index_name']}*")
-            return "\n".join(output)
-
-        # Sort entries with "#" (special chars/numbers) at the end
-        def sort_key(item):
-            term = item[0]
-            first_letter = self.normalize_first_letter(term)
-            return (first_letter != '#', term.lower())
-
-        entries = sorted(entries, key=sort_key)
-
-        current_letter = None
-
-        for term, references in entries:
-            # Get first letter (normalize special chars and numbers to "#")
-            first_letter = self.normalize_first_letter(term)
-
-            # Add letter heading if new letter
-            if first_letter != current_letter:
-                if current_letter is not None:
-                    output.append("")  # Blank line between letter sections
-                output.append(f"## {first_letter}")
-                output.append("")
-                current_letter = first_letter
-
-            # Format references
-            ref_str = ", ".join(references)
-
-            output.append(f"- **{term}**: {ref_str}")
-
-        output.append("")
-        output.append(f"---")
-        output.append(f"*Total entries: {len(entries)}*")
-        output.append("")
-        output.append(f"*Created with Page Sage  •  {metadata['index_name']}*")
-
-        return "\n".join(output)
+            yield "\n".join(output)
+            return
+
+        # Sort entries with "#" (special chars/numbers) first
+        entries = _prepare_sorted(entries)
+
+        # One block per letter section, separated by a blank line
+        sections = (
+            f"## {first_letter}\n\n"
+            + "\n".join([f"- **{term}**: {', '.join(references)}" for term, references in group])
+            for first_letter, group in _group_by_letter(entries)
+        )
+
+        yield from _stream_text(output, sections, [
+            "",
+            "---",
+            f"*Total entries: {len(entries)}*",
+            "",
+            f"*Created with Page Sage  •  {metadata['index_name']}*",
+        ])
 
     def format_pdf(self, entries: List[Tuple[str, List[str]]],
                    output_path: str, metadata: dict = None) -> bool:
         """
         Format index entries as a 4-column landscape PDF with continuous flow
+        output_path may be a file path or a writable binary file object
         Returns True if successful
         """
         if metadata is None:
@@ -291,11 +458,8 @@ class IndexFormatter:
 
         try:
             from reportlab.lib.pagesizes import letter, landscape
-            from reportlab.lib import colors
             from reportlab.lib.units import inch
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, KeepTogether, Table, TableStyle, PageBreak, Image, FrameBreak, NextPageTemplate
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib.enums import TA_LEFT, TA_CENTER
+            from reportlab.platypus import Paragraph, Spacer, Table, PageBreak, Image, FrameBreak, NextPageTemplate
             from reportlab.platypus.doctemplate import PageTemplate, BaseDocTemplate
             from reportlab.platypus.frames import Frame
             import os
@@ -304,13 +468,7 @@ class IndexFormatter:
                 return False
 
             # Sort entries with "#" (special chars/numbers) at the end
-            def sort_key(item):
-                term = item[0]
-                first_letter = self.normalize_first_letter(term)
-                # Put "#" at end, otherwise sort alphabetically
-                return (first_letter == '#', term.lower())
-
-            entries = sorted(entries, key=sort_key)
+            entries = _prepare_sorted(entries, hash_last=True)
 
             # Define page number footer function with index name
             def add_footer(canvas, doc):
@@ -376,74 +534,8 @@ class IndexFormatter:
             index_template = PageTemplate(id='FourCol', frames=index_frames, onPage=add_footer)
             doc.addPageTemplates([cover_template, index_template])
 
-            # Styles
-            styles = getSampleStyleSheet()
-
-            # Get accent color from metadata (default to pink if not provided)
-            accent_color = metadata.get('color_scheme', '#f2849e')
-
-            # Title style for front page
-            title_style = ParagraphStyle(
-                'TitleStyle',
-                parent=styles['Title'],
-                fontSize=24,
-                textColor=colors.HexColor(accent_color),
-                spaceAfter=12,
-                alignment=TA_CENTER,
-                fontName='Helvetica-Bold'
-            )
-
-            # Front page heading style
-            front_heading_style = ParagraphStyle(
-                'FrontHeadingStyle',
-                parent=styles['Heading2'],
-                fontSize=14,
-                textColor=colors.HexColor(accent_color),
-                spaceAfter=8,
-                spaceBefore=12,
-                fontName='Helvetica-Bold'
-            )
-
-            # Front page content style
-            front_content_style = ParagraphStyle(
-                'FrontContentStyle',
-                parent=styles['Normal'],
-                fontSize=11,
-                spaceAfter=6,
-                leftIndent=20
-            )
-
-            # Book metadata style (smaller than front content)
-            book_metadata_style = ParagraphStyle(
-                'BookMetadataStyle',
-                parent=styles['Normal'],
-                fontSize=9,
-                spaceAfter=2,
-                leftIndent=20,
-                textColor=colors.HexColor('#666666')
-            )
-
-            # Letter heading style (larger and bold)
-            heading_style = ParagraphStyle(
-                'LetterHeading',
-                parent=styles['Heading1'],
-                fontSize=14,
-                textColor=colors.HexColor(accent_color),
-                spaceAfter=8,
-                spaceBefore=12,
-                fontName='Helvetica-Bold',
-                keepWithNext=True
-            )
-
-            # Entry style (term in bold, references in normal)
-            entry_style = ParagraphStyle(
-                'EntryStyle',
-                parent=styles['Normal'],
-                fontSize=9,
-                leftIndent=10,
-                spaceAfter=4,
-                leading=11
-            )
+            # Styles (default accent is pink if not provided)
+            styles = _pdf_styles(metadata.get('color_scheme', '#f2849e'))
 
             # Build content as a continuous flow
             story = []
@@ -460,13 +552,12 @@ class IndexFormatter:
                     pass  # Skip logo if there's an error loading it
 
             # Index name
-            story.append(Paragraph(metadata['index_name'], title_style))
+            story.append(Paragraph(metadata['index_name'], styles['title']))
             story.append(Spacer(1, 0.3 * inch))
 
             # Generated date
             story.append(Paragraph(f"<i>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>",
-                                 ParagraphStyle('DateStyle', parent=styles['Normal'], fontSize=10,
-                                              alignment=TA_CENTER, textColor=colors.HexColor('#666666'))))
+                                   styles['date']))
 
             # Move to column 2 for Books and Properties
             story.append(FrameBreak())
@@ -475,60 +566,50 @@ class IndexFormatter:
             if metadata['books']:
                 # Only show "Books" heading if multiple books
                 if not metadata.get('single_book'):
-                    story.append(Paragraph("Books", front_heading_style))
+                    story.append(Paragraph("Books", styles['front_heading']))
                 for book in metadata['books']:
                     page_info = f" ({book['page_count']} pages)" if book['page_count'] else ""
                     story.append(Paragraph(f"<b>Book {book['book_number']}:</b> {self.escape_html(book['book_name'])}{page_info}",
-                                         front_content_style))
+                                         styles['front_content']))
                     # Add book custom metadata if present
                     if book.get('metadata'):
                         for prop in book['metadata']:
                             story.append(Paragraph(f"<b>{self.escape_html(prop['name'])}:</b> {self.escape_html(prop['value'])}",
-                                                 book_metadata_style))
+                                                 styles['book_metadata']))
                         story.append(Spacer(1, 0.1 * inch))
                 story.append(Spacer(1, 0.3 * inch))
 
             # Custom properties section (follows books, can overflow)
             if metadata['custom_properties']:
-                story.append(Paragraph("Properties", front_heading_style))
+                story.append(Paragraph("Properties", styles['front_heading']))
                 for prop in metadata['custom_properties']:
                     story.append(Paragraph(f"<b>{self.escape_html(prop['name'])}:</b> {self.escape_html(prop['value'])}",
-                                         front_content_style))
+                                         styles['front_content']))
                 story.append(Spacer(1, 0.3 * inch))
 
             # Switch to 4-column layout and page break before index
             story.append(NextPageTemplate('FourCol'))
             story.append(PageBreak())
 
-            # Now add index entries
-            current_letter = None
-
-            for term, references in entries:
-                # Get first letter (normalize special chars and numbers to "#")
-                first_letter = self.normalize_first_letter(term)
-
-                # Add letter heading when we encounter a new letter
-                if first_letter != current_letter:
-                    if current_letter is not None:
-                        story.append(Spacer(1, 0.1 * inch))
-
-                    # Add letter heading with grey background
-                    heading_para = Paragraph(f"<b>{first_letter}</b>", heading_style)
-                    heading_table = Table([[heading_para]], colWidths=[index_frame_width - 12])
-                    heading_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f1f5f9')),
-                        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                        ('TOPPADDING', (0, 0), (-1, -1), 4),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                    ]))
-                    story.append(heading_table)
-                    current_letter = first_letter
-
-                # Format entry: term in bold, references in normal text
-                ref_str = ", ".join(references)
-                entry_text = f"<b>{self.escape_html(term)}</b>: {self.escape_html(ref_str)}"
-                story.append(Paragraph(entry_text, entry_style))
+            # Now add index entries: one heading table plus one entries table per letter,
+            # so ReportLab lays out each letter's rows in bulk rather than as separate flowables
+            col_width = index_frame_width - 12
+            for i, (first_letter, group) in enumerate(_group_by_letter(entries)):
+                if i:
+                    story.append(Spacer(1, 0.1 * inch))
+
+                # Add letter heading with grey background
+                heading_para = Paragraph(f"<b>{first_letter}</b>", styles['letter_heading'])
+                heading_table = Table([[heading_para]], colWidths=[col_width])
+                heading_table.setStyle(styles['letter_table'])
+                story.append(heading_table)
+
+                # Entries: term in bold, references in normal text
+                # (references are always b:p / b:p-p, so only the term needs escaping)
+                escape = self.escape_html
+                rows = [[Paragraph(f"<b>{escape(term)}</b>: {', '.join(references)}", styles['entry'])]
+                        for term, references in group]
+                story.append(Table(rows, colWidths=[col_width], style=styles['entry_table']))
 
             # Build PDF
             doc.build(story)
@@ -537,94 +618,81 @@ class IndexFormatter:
         except ImportError:
             return False
 
-    @staticmethod
-    def escape_html(text: str) -> str:
-        """Escape HTML special characters for use in ReportLab"""
-        replacements = {
-            '&': '&amp;',
-            '<': '&lt;',
-            '>': '&gt;',
-        }
+    # Single-pass translation tables for the escape helpers
+    _HTML_TABLE = str.maketrans({
+        '&': '&amp;',
+        '<': '&lt;',
+        '>': '&gt;',
+    })
+    _LATEX_TABLE = str.maketrans(_LATEX_ESCAPES)
 
-        for char, replacement in replacements.items():
-            text = text.replace(char, replacement)
+    @classmethod
+    def escape_html(cls, text: str) -> str:
+        """Escape HTML special characters for use in ReportLab"""
+        return text.translate(cls._HTML_TABLE)
 
-        return text
+    @classmethod
+    def escape_latex(cls, text: str) -> str:
+        """Escape special LaTeX characters"""
+        return text.translate(cls._LATEX_TABLE)
 
     @staticmethod
-    def escape_latex(text: str) -> str:
-        """Escape special LaTeX characters"""
-        replacements = {
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '^': r'\textasciicircum{}',
-            '\\': r'\textbackslash{}',
-        }
-
-        for char, replacement in replacements.items():
-            text = text.replace(char, replacement)
-
-        return text
+    def _escape_latex_note(text: str) -> str:
+        """escape_latex plus a \\par after each blank line, in a single pass"""
+        return _LATEX_NOTE_RE.sub(lambda m: _LATEX_NOTE_REPLACEMENTS[m.group()], text)
 
     def format_notes_text(self, notes: List[Tuple[str, str]]) -> str:
         """
         Format notes as plain text
         """
-        if not notes:
-            return "Empty notes\n"
+        return "".join(self.iter_notes_text(notes))
 
-        # Sort notes with "#" (special chars/numbers) at the end
-        def sort_key(item):
-            term = item[0]
-            first_letter = self.normalize_first_letter(term)
-            # Put "#" at beginning, otherwise sort alphabetically
-            return (first_letter != '#', term.lower())
+    def iter_notes_text(self, notes: List[Tuple[str, str]], chunk_size: int = 1000):
+        """
+        Format notes as plain text, yielding chunk_size notes at a time
+        """
+        if not notes:
+            yield "Empty notes\n"
+            return
 
-        notes = sorted(notes, key=sort_key)
+        # Sort notes with "#" (special chars/numbers) first
+        notes = _prepare_sorted(notes)
 
-        output = []
+        # Written straight into one buffer rather than a list of lines
+        buf = StringIO()
+        write = buf.write
 
         # Add header
-        output.append("=" * 60)
-        output.append("Notes".center(60))
-        output.append("=" * 60)
-        output.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        output.append("=" * 60)
-        output.append("")
+        rule = "=" * 60
+        write(f"{rule}\n{'Notes'.center(60)}\n{rule}\n")
+        write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n{rule}\n\n")
 
-        for term, note in notes:
-            output.append(f"{term}")
-            output.append("-" * 40)
-            output.append(note)
-            output.append("")
+        divider = "-" * 40
+        for i, (term, note) in enumerate(notes, 1):
+            write(f"{term}\n{divider}\n")
+            write(note)
+            write("\n\n")
+            if i % chunk_size == 0:
+                yield _drain(buf)
 
-        output.append("=" * 60)
-        output.append(f"Total notes: {len(notes)}")
-        output.append("=" * 60)
+        write(f"{rule}\nTotal notes: {len(notes)}\n{rule}")
 
-        return "\n".join(output)
+        yield _drain(buf)
 
     def format_notes_csv(self, notes: List[Tuple[str, str]]) -> str:
         """
         Format notes as CSV
         """
-        import csv
-        from io import StringIO
+        return "".join(self.iter_notes_csv(notes))
 
-        # Sort notes with "#" (special chars/numbers) at the end
-        def sort_key(item):
-            term = item[0]
-            first_letter = self.normalize_first_letter(term)
-            # Put "#" at beginning, otherwise sort alphabetically
-            return (first_letter != '#', term.lower())
+    def iter_notes_csv(self, notes: List[Tuple[str, str]], chunk_size: int = 1000):
+        """
+        Format notes as CSV, yielding chunk_size rows at a time
+        """
+        import csv
 
-        notes = sorted(notes, key=sort_key)
+        # Sort notes with "#" (special chars/numbers) first
+        notes = _prepare_sorted(notes)
 
         output = StringIO()
         writer = csv.writer(output)
@@ -632,15 +700,18 @@ class IndexFormatter:
         # Write header
         writer.writerow(['Term', 'Notes'])
 
-        # Write data
-        for term, note in notes:
-            writer.writerow([term, note])
+        # Write data (notes are already (term, note) rows), reusing one buffer per chunk
+        for start in range(0, len(notes), chunk_size):
+            writer.writerows(notes[start:start + chunk_size])
+            yield _drain(output)
 
-        return output.getvalue()
+        if output.tell():
+            yield _drain(output)
 
     def format_notes_pdf(self, notes: List[Tuple[str, str]], output_path: str, metadata: dict = None) -> bool:
         """
         Format notes as a 2-column landscape PDF with cover page
+        output_path may be a file path or a writable binary file object
         Returns True if successful
         """
         if metadata is None:
@@ -648,11 +719,8 @@ class IndexFormatter:
 
         try:
             from reportlab.lib.pagesizes import letter, landscape
-            from reportlab.lib import colors
             from reportlab.lib.units import inch
-            from reportlab.platypus import Paragraph, Spacer, Table, TableStyle, PageBreak, Image, FrameBreak, NextPageTemplate
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib.enums import TA_LEFT, TA_CENTER
+            from reportlab.platypus import Paragraph, Spacer, Table, PageBreak, Image, FrameBreak, NextPageTemplate
             from reportlab.platypus.doctemplate import BaseDocTemplate, PageTemplate
             from reportlab.platypus.frames import Frame
             import os
@@ -661,13 +729,7 @@ class IndexFormatter:
                 return False
 
             # Sort notes with "#" (special chars/numbers) at the end
-            def sort_key(item):
-                term = item[0]
-                first_letter = self.normalize_first_letter(term)
-                # Put "#" at end, otherwise sort alphabetically
-                return (first_letter == '#', term.lower())
-
-            notes = sorted(notes, key=sort_key)
+            notes = _prepare_sorted(notes, hash_last=True)
 
             # Get accent color from metadata (default to sage green if not provided)
             accent_color = metadata.get('color_scheme', '#87AE73')
@@ -739,82 +801,7 @@ class IndexFormatter:
             doc.addPageTemplates([cover_template, notes_template])
 
             # Styles
-            styles = getSampleStyleSheet()
-
-            # Title style for front page
-            title_style = ParagraphStyle(
-                'TitleStyle',
-                parent=styles['Title'],
-                fontSize=24,
-                textColor=colors.HexColor(accent_color),
-                spaceAfter=12,
-                alignment=TA_CENTER,
-                fontName='Helvetica-Bold'
-            )
-
-            # Front page heading style
-            front_heading_style = ParagraphStyle(
-                'FrontHeadingStyle',
-                parent=styles['Heading2'],
-                fontSize=14,
-                textColor=colors.HexColor(accent_color),
-                spaceAfter=8,
-                spaceBefore=12,
-                fontName='Helvetica-Bold'
-            )
-
-            # Front page content style
-            front_content_style = ParagraphStyle(
-                'FrontContentStyle',
-                parent=styles['Normal'],
-                fontSize=11,
-                spaceAfter=6,
-                leftIndent=20
-            )
-
-            # Book metadata style (smaller than front content)
-            book_metadata_style = ParagraphStyle(
-                'BookMetadataStyle',
-                parent=styles['Normal'],
-                fontSize=9,
-                spaceAfter=2,
-                leftIndent=20,
-                textColor=colors.HexColor('#666666')
-            )
-
-            # Letter heading style (for section dividers)
-            letter_heading_style = ParagraphStyle(
-                'LetterHeading',
-                parent=styles['Heading1'],
-                fontSize=14,
-                textColor=colors.HexColor(accent_color),
-                spaceAfter=8,
-                spaceBefore=12,
-                fontName='Helvetica-Bold',
-                keepWithNext=True
-            )
-
-            # Term heading style
-            term_style = ParagraphStyle(
-                'TermStyle',
-                parent=styles['Heading2'],
-                fontSize=12,
-                textColor=colors.HexColor(accent_color),
-                spaceAfter=6,
-                spaceBefore=10,
-                fontName='Helvetica-Bold',
-                keepWithNext=True
-            )
-
-            # Notes text style
-            notes_text_style = ParagraphStyle(
-                'NotesStyle',
-                parent=styles['Normal'],
-                fontSize=9,
-                leftIndent=10,
-                spaceAfter=12,
-                leading=12
-            )
+            styles = _pdf_styles(accent_color)
 
             # Build content
             story = []
@@ -831,16 +818,13 @@ class IndexFormatter:
                     pass  # Skip logo if there's an error loading it
 
             # Index name with "Notes" subtitle
-            story.append(Paragraph(metadata['index_name'], title_style))
-            story.append(Paragraph("Study Notes", ParagraphStyle('SubtitleStyle', parent=styles['Normal'],
-                                                                  fontSize=16, alignment=TA_CENTER,
-                                                                  textColor=colors.HexColor('#666666'))))
+            story.append(Paragraph(metadata['index_name'], styles['title']))
+            story.append(Paragraph("Study Notes", styles['subtitle']))
             story.append(Spacer(1, 0.3 * inch))
 
             # Generated date
             story.append(Paragraph(f"<i>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>",
-                                 ParagraphStyle('DateStyle', parent=styles['Normal'], fontSize=10,
-                                              alignment=TA_CENTER, textColor=colors.HexColor('#666666'))))
+                                   styles['date']))
 
             # Move to column 2 for Books and Properties
             story.append(FrameBreak())
@@ -849,25 +833,25 @@ class IndexFormatter:
             if metadata.get('books'):
                 # Only show "Books" heading if multiple books
                 if not metadata.get('single_book'):
-                    story.append(Paragraph("Books", front_heading_style))
+                    story.append(Paragraph("Books", styles['front_heading']))
                 for book in metadata['books']:
                     page_info = f" ({book['page_count']} pages)" if book.get('page_count') else ""
                     story.append(Paragraph(f"<b>Book {book['book_number']}:</b> {self.escape_html(book['book_name'])}{page_info}",
-                                         front_content_style))
+                                         styles['front_content']))
                     # Add book custom metadata if present
                     if book.get('metadata'):
                         for prop in book['metadata']:
                             story.append(Paragraph(f"<b>{self.escape_html(prop['name'])}:</b> {self.escape_html(prop['value'])}",
-                                                 book_metadata_style))
+                                                 styles['book_metadata']))
                         story.append(Spacer(1, 0.1 * inch))
                 story.append(Spacer(1, 0.3 * inch))
 
             # Custom properties section (follows books, can overflow)
             if metadata.get('custom_properties'):
-                story.append(Paragraph("Properties", front_heading_style))
+                story.append(Paragraph("Properties", styles['front_heading']))
                 for prop in metadata['custom_properties']:
                     story.append(Paragraph(f"<b>{self.escape_html(prop['name'])}:</b> {self.escape_html(prop['value'])}",
-                                         front_content_style))
+                                         styles['front_content']))
                 story.append(Spacer(1, 0.3 * inch))
 
             # Switch to 2-column layout and page break before notes
@@ -875,37 +859,24 @@ class IndexFormatter:
             story.append(PageBreak())
 
             # Now add notes entries with letter dividers
-            current_letter = None
+            heading_width = notes_frame_width - 20
+            for i, (first_letter, group) in enumerate(_group_by_letter(notes)):
+                if i:
+                    story.append(Spacer(1, 0.1 * inch))
 
-            for term, note in notes:
-                # Get first letter (normalize special chars and numbers to "#")
-                first_letter = self.normalize_first_letter(term)
+                # Add letter heading with grey background
+                heading_para = Paragraph(f"<b>{first_letter}</b>", styles['letter_heading'])
+                heading_table = Table([[heading_para]], colWidths=[heading_width])
+                heading_table.setStyle(styles['letter_table'])
+                story.append(heading_table)
 
-                # Add letter heading when we encounter a new letter
-                if first_letter != current_letter:
-                    if current_letter is not None:
-                        story.append(Spacer(1, 0.1 * inch))
+                for term, note in group:
+                    # Add term heading
+                    story.append(Paragraph(f"<b>{self.escape_html(term)}</b>", styles['term']))
 
-                    # Add letter heading with grey background
-                    heading_para = Paragraph(f"<b>{first_letter}</b>", letter_heading_style)
-                    heading_table = Table([[heading_para]], colWidths=[notes_frame_width - 20])
-                    heading_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f1f5f9')),
-                        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                        ('TOPPADDING', (0, 0), (-1, -1), 4),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                    ]))
-                    story.append(heading_table)
-                    current_letter = first_letter
-
-                # Add term heading
-                story.append(Paragraph(f"<b>{self.escape_html(term)}</b>", term_style))
-
-                # Add notes text
-                # Preserve line breaks in notes
-                note_html = self.escape_html(note).replace('\n', '<br/>')
-                story.append(Paragraph(note_html, notes_text_style))
+                    # Add notes text, preserving line breaks
+                    note_html = self.escape_html(note).replace('\n', '<br/>')
+                    story.append(Paragraph(note_html, styles['notes']))
 
             # Build PDF
             doc.build(story)
@@ -919,19 +890,20 @@ class IndexFormatter:
         """
         Format index entries as CSV
         """
+        return "".join(self.iter_csv(entries, metadata))
+
+    def iter_csv(self, entries: List[Tuple[str, List[str]]],
+                 metadata: dict = None, chunk_size: int = 1000):
+        """
+        Format index entries as CSV, yielding chunk_size rows at a time
+        """
         import csv
-        from io import StringIO
 
         if metadata is None:
             metadata = {'index_name': 'Index', 'books': [], 'custom_properties': []}
 
         # Sort entries
-        def sort_key(item):
-            term = item[0]
-            first_letter = self.normalize_first_letter(term)
-            return (first_letter != '#', term.lower())
-
-        entries = sorted(entries, key=sort_key)
+        entries = _prepare_sorted(entries)
 
         output = StringIO()
         writer = csv.writer(output)
@@ -939,111 +911,114 @@ class IndexFormatter:
         # Write header
         writer.writerow(['Term', 'References'])
 
-        # Write data
-        for term, references in entries:
-            ref_str = ", ".join(references)
-            writer.writerow([term, ref_str])
+        # Write data, reusing one buffer per chunk
+        for start in range(0, len(entries), chunk_size):
+            writer.writerows((term, ", ".join(references))
+                             for term, references in entries[start:start + chunk_size])
+            yield _drain(output)
 
-        return output.getvalue()
+        if output.tell():
+            yield _drain(output)
 
     def format_excel(self, entries: List[Tuple[str, List[str]]],
                      output_path: str, metadata: dict = None) -> bool:
         """
         Format index entries as an Excel file
+        output_path may be a file path or a writable binary file object
         Returns True if successful
         """
         if metadata is None:
             metadata = {'index_name': 'Index', 'books': [], 'custom_properties': []}
 
-        try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, PatternFill
-            from openpyxl.utils import get_column_letter
+        if not entries:
+            return False
 
-            if not entries:
-                return False
+        # Sort entries
+        entries = _prepare_sorted(entries, hash_last=True)
+        generated = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 
-            # Sort entries
-            def sort_key(item):
-                term = item[0]
-                first_letter = self.normalize_first_letter(term)
-                return (first_letter == '#', term.lower())
+        # Fastest backend first: pyexcelerate writes each sheet from a prebuilt row list
+        def sheets():
+            info_rows = [[metadata['index_name']], [generated]]
+            info_bold = [1]
+            if metadata['books']:
+                info_rows += [[], ["Books"]]
+                info_bold.append(len(info_rows))
+                info_rows += [[f"Book {book['book_number']}: {book['book_name']}"
+                               + (f" ({book['page_count']} pages)" if book['page_count'] else "")]
+                              for book in metadata['books']]
+            if metadata['custom_properties']:
+                info_rows += [[], ["Properties"]]
+                info_bold.append(len(info_rows))
+                info_rows += [[f"{prop['name']}: {prop['value']}"] for prop in metadata['custom_properties']]
+
+            index_rows = [["Term", "References"]]
+            index_bold = [1]
+            for first_letter, group in _group_by_letter(entries):
+                index_rows.append([first_letter])
+                index_bold.append(len(index_rows))
+                index_rows.extend([[term, ", ".join(references)] for term, references in group])
+
+            return [("Index Info", info_rows, (60,), info_bold),
+                    ("Index", index_rows, (40, 60), index_bold)]
+
+        if self._write_xlsx_fast(sheets, output_path):
+            return True
+
+        # Then xlsxwriter when it is installed (constant memory, rows flushed as written)
+        try:
+            import xlsxwriter
+        except ImportError:
+            pass
+        else:
+            return self._excel_xlsxwriter(xlsxwriter, entries, output_path, metadata, generated)
 
-            entries = sorted(entries, key=sort_key)
+        try:
+            from openpyxl import Workbook
+            styles = _openpyxl_styles()
 
-            # Create workbook
-            wb = Workbook()
+            # Create workbook (write-only: rows are streamed instead of kept as Cell objects)
+            wb = Workbook(write_only=True)
 
             # Metadata sheet
-            ws_meta = wb.active
-            ws_meta.title = "Index Info"
+            ws_meta = wb.create_sheet("Index Info")
+            ws_meta.column_dimensions['A'].width = 60
 
             # Add index name
-            ws_meta['A1'] = metadata['index_name']
-            ws_meta['A1'].font = Font(size=16, bold=True)
-            ws_meta['A2'] = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            ws_meta.append([_styled_cell(ws_meta, metadata['index_name'], styles['title_font'])])
+            ws_meta.append([generated])
 
             # Add books
             if metadata['books']:
-                row = 4
-                ws_meta[f'A{row}'] = "Books"
-                ws_meta[f'A{row}'].font = Font(size=12, bold=True)
-                row += 1
+                ws_meta.append([])
+                ws_meta.append([_styled_cell(ws_meta, "Books", styles['section_font'])])
                 for book in metadata['books']:
                     page_info = f" ({book['page_count']} pages)" if book['page_count'] else ""
-                    ws_meta[f'A{row}'] = f"Book {book['book_number']}: {book['book_name']}{page_info}"
-                    row += 1
-                row += 1
+                    ws_meta.append([f"Book {book['book_number']}: {book['book_name']}{page_info}"])
 
             # Add custom properties
             if metadata['custom_properties']:
-                if not metadata['books']:
-                    row = 4
-                ws_meta[f'A{row}'] = "Properties"
-                ws_meta[f'A{row}'].font = Font(size=12, bold=True)
-                row += 1
+                ws_meta.append([])
+                ws_meta.append([_styled_cell(ws_meta, "Properties", styles['section_font'])])
                 for prop in metadata['custom_properties']:
-                    ws_meta[f'A{row}'] = f"{prop['name']}: {prop['value']}"
-                    row += 1
-
-            # Adjust column width
-            ws_meta.column_dimensions['A'].width = 60
+                    ws_meta.append([f"{prop['name']}: {prop['value']}"])
 
             # Index entries sheet
             ws = wb.create_sheet("Index")
+            ws.column_dimensions['A'].width = 40
+            ws.column_dimensions['B'].width = 60
 
             # Headers
-            ws['A1'] = "Term"
-            ws['B1'] = "References"
-            ws['A1'].font = Font(bold=True)
-            ws['B1'].font = Font(bold=True)
-            ws['A1'].fill = PatternFill(start_color="E2E8F0", end_color="E2E8F0", fill_type="solid")
-            ws['B1'].fill = PatternFill(start_color="E2E8F0", end_color="E2E8F0", fill_type="solid")
-
-            # Add entries
-            row = 2
-            current_letter = None
-
-            for term, references in entries:
-                first_letter = self.normalize_first_letter(term)
-
-                # Add letter heading
-                if first_letter != current_letter:
-                    ws[f'A{row}'] = first_letter
-                    ws[f'A{row}'].font = Font(size=14, bold=True)
-                    ws[f'A{row}'].fill = PatternFill(start_color="F1F5F9", end_color="F1F5F9", fill_type="solid")
-                    ws.merge_cells(f'A{row}:B{row}')
-                    row += 1
-                    current_letter = first_letter
-
-                # Add entry
-                ws[f'A{row}'] = term
-                ws[f'B{row}'] = ", ".join(references)
-                row += 1
+            ws.append([_styled_cell(ws, "Term", styles['header_font'], styles['header_fill']),
+                       _styled_cell(ws, "References", styles['header_font'], styles['header_fill'])])
 
-            # Adjust column widths
-            ws.column_dimensions['A'].width = 40
-            ws.column_dimensions['B'].width = 60
+            # Add entries, with a shaded heading row per letter
+            # (write-only sheets can't merge cells, so the fill spans both columns instead)
+            for first_letter, group in _group_by_letter(entries):
+                ws.append([_styled_cell(ws, first_letter, styles['letter_font'], styles['letter_fill']),
+                           _styled_cell(ws, None, styles['letter_font'], styles['letter_fill'])])
+                for term, references in group:
+                    ws.append([term, ", ".join(references)])
 
             # Save workbook
             wb.save(output_path)
@@ -1056,131 +1031,241 @@ class IndexFormatter:
         """
         Format notes as LaTeX
         """
+        return "".join(self.iter_notes_latex(notes))
+
+    def iter_notes_latex(self, notes: List[Tuple[str, str]], chunk_size: int = 1000):
+        """
+        Format notes as LaTeX, yielding chunk_size notes at a time
+        """
         if not notes:
-            return "% Empty notes\n"
+            yield "% Empty notes\n"
+            return
 
         # Sort notes
-        def sort_key(item):
-            term = item[0]
-            first_letter = self.normalize_first_letter(term)
-            return (first_letter != '#', term.lower())
-
-        notes = sorted(notes, key=sort_key)
+        notes = _prepare_sorted(notes)
 
-        output = []
+        # Written straight into one buffer rather than a list of lines
+        buf = StringIO()
+        write = buf.write
+        now = datetime.now()
 
         # Header
-        output.append("% Notes")
-        output.append(f"% Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        output.append("")
-        output.append("\\documentclass{article}")
-        output.append("\\usepackage[utf8]{inputenc}")
-        output.append("\\title{Notes}")
-        output.append("\\date{" + datetime.now().strftime('%Y-%m-%d') + "}")
-        output.append("")
-        output.append("\\begin{document}")
-        output.append("\\maketitle")
-        output.append("")
-
-        for term, note in notes:
-            output.append(f"\\section*{{{self.escape_latex(term)}}}")
-            output.append("")
-            # Escape note content and preserve line breaks
-            escaped_note = self.escape_latex(note)
-            # Replace double newlines with paragraph breaks
-            escaped_note = escaped_note.replace('\n\n', '\n\n\\par\n')
-            output.append(escaped_note)
-            output.append("")
-
-        output.append("\\end{document}")
-
-        return "\n".join(output)
+        write("% Notes\n")
+        write(f"% Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        write("\\documentclass{article}\n")
+        write("\\usepackage[utf8]{inputenc}\n")
+        write("\\title{Notes}\n")
+        write("\\date{" + now.strftime('%Y-%m-%d') + "}\n\n")
+        write("\\begin{document}\n")
+        write("\\maketitle\n\n")
+
+        for i, (term, note) in enumerate(notes, 1):
+            write("\\section*{")
+            write(self.escape_latex(term))
+            write("}\n\n")
+            # Escape note content and turn double newlines into paragraph breaks
+            write(self._escape_latex_note(note))
+            write("\n\n")
+            if i % chunk_size == 0:
+                yield _drain(buf)
+
+        write("\\end{document}")
+
+        yield _drain(buf)
 
     def format_notes_markdown(self, notes: List[Tuple[str, str]]) -> str:
         """
         Format notes as Markdown
         """
+        return "".join(self.iter_notes_markdown(notes))
+
+    def iter_notes_markdown(self, notes: List[Tuple[str, str]], chunk_size: int = 1000):
+        """
+        Format notes as Markdown, yielding chunk_size notes at a time
+        """
         if not notes:
-            return "*Empty notes*\n"
+            yield "*Empty notes*\n"
+            return
 
         # Sort notes
-        def sort_key(item):
-            term = item[0]
-            first_letter = self.normalize_first_letter(term)
-            return (first_letter != '#', term.lower())
+        notes = _prepare_sorted(notes)
 
-        notes = sorted(notes, key=sort_key)
-
-        output = []
+        # Written straight into one buffer rather than a list of lines
+        buf = StringIO()
+        write = buf.write
 
         # Header
-        output.append("# Notes")
-        output.append("")
-        output.append(f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
-        output.append("")
-        output.append("---")
-        output.append("")
+        write("# Notes\n\n")
+        write(f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n")
+        write("---\n\n")
 
-        for term, note in notes:
-            output.append(f"## {term}")
-            output.append("")
-            output.append(note)
-            output.append("")
+        for i, (term, note) in enumerate(notes, 1):
+            write(f"## {term}\n\n")
+            write(note)
+            write("\n\n")
+            if i % chunk_size == 0:
+                yield _drain(buf)
 
-        output.append("---")
-        output.append(f"*Total notes: {len(notes)}*")
+        write(f"---\n*Total notes: {len(notes)}*")
 
-        return "\n".join(output)
+        yield _drain(buf)
 
     def format_notes_excel(self, notes: List[Tuple[str, str]], output_path: str) -> bool:
         """
         Format notes as an Excel file
+        output_path may be a file path or a writable binary file object
         Returns True if successful
         """
-        try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, PatternFill
-            from openpyxl.utils import get_column_letter
+        if not notes:
+            return False
 
-            if not notes:
-                return False
+        # Sort notes
+        notes = _prepare_sorted(notes, hash_last=True)
 
-            # Sort notes
-            def sort_key(item):
-                term = item[0]
-                first_letter = self.normalize_first_letter(term)
-                return (first_letter == '#', term.lower())
+        # Fastest backend first: pyexcelerate writes the whole sheet from one row list
+        def sheets():
+            rows = [["Term", "Notes"]] + [[term, note] for term, note in notes]
+            return [("Notes", rows, (30, 80), [1])]
 
-            notes = sorted(notes, key=sort_key)
+        if self._write_xlsx_fast(sheets, output_path):
+            return True
 
-            # Create workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Notes"
+        # Then xlsxwriter when it is installed (constant memory, rows flushed as written)
+        try:
+            import xlsxwriter
+        except ImportError:
+            pass
+        else:
+            return self._notes_excel_xlsxwriter(xlsxwriter, notes, output_path)
 
-            # Headers
-            ws['A1'] = "Term"
-            ws['B1'] = "Notes"
-            ws['A1'].font = Font(bold=True)
-            ws['B1'].font = Font(bold=True)
-            ws['A1'].fill = PatternFill(start_color="E2E8F0", end_color="E2E8F0", fill_type="solid")
-            ws['B1'].fill = PatternFill(start_color="E2E8F0", end_color="E2E8F0", fill_type="solid")
+        try:
+            from openpyxl import Workbook
+            styles = _openpyxl_styles()
 
-            # Add notes
-            row = 2
-            for term, note in notes:
-                ws[f'A{row}'] = term
-                ws[f'B{row}'] = note
-                ws[f'B{row}'].alignment = Alignment(wrap_text=True, vertical='top')
-                row += 1
+            # Create workbook (write-only: rows are streamed instead of kept as Cell objects)
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Notes")
 
-            # Adjust column widths
+            # Column widths must be set before any rows are written
             ws.column_dimensions['A'].width = 30
             ws.column_dimensions['B'].width = 80
 
+            # Headers
+            ws.append([_styled_cell(ws, "Term", styles['header_font'], styles['header_fill']),
+                       _styled_cell(ws, "Notes", styles['header_font'], styles['header_fill'])])
+
+            # Add notes
+            for term, note in notes:
+                ws.append([term, _styled_cell(ws, note, alignment=styles['wrap'])])
+
             # Save workbook
             wb.save(output_path)
             return True
 
         except ImportError:
-            return False
\ No newline at end of file
+            return False
+
+    def _excel_xlsxwriter(self, xlsxwriter, entries: List[Tuple[str, List[str]]],
+                          output_path: str, metadata: dict, generated: str) -> bool:
+        """
+        Write sorted index entries with xlsxwriter
+        Same layout as the openpyxl writer in format_excel
+        """
+        workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True,
+                                                     'strings_to_numbers': False,
+                                                     'strings_to_formulas': False,
+                                                     'strings_to_urls': False})
+        title_fmt = workbook.add_format({'bold': True, 'font_size': 16})
+        section_fmt = workbook.add_format({'bold': True, 'font_size': 12})
+        header_fmt = workbook.add_format({'bold': True, 'bg_color': '#E2E8F0'})
+        letter_fmt = workbook.add_format({'bold': True, 'font_size': 14, 'bg_color': '#F1F5F9'})
+
+        # Metadata sheet
+        ws_meta = workbook.add_worksheet("Index Info")
+        ws_meta.set_column('A:A', 60)
+        ws_meta.write_string(0, 0, metadata['index_name'], title_fmt)
+        ws_meta.write_string(1, 0, generated)
+
+        row = 3
+        if metadata['books']:
+            ws_meta.write_string(row, 0, "Books", section_fmt)
+            row += 1
+            for book in metadata['books']:
+                page_info = f" ({book['page_count']} pages)" if book['page_count'] else ""
+                ws_meta.write_string(row, 0, f"Book {book['book_number']}: {book['book_name']}{page_info}")
+                row += 1
+            row += 1
+
+        if metadata['custom_properties']:
+            ws_meta.write_string(row, 0, "Properties", section_fmt)
+            row += 1
+            for prop in metadata['custom_properties']:
+                ws_meta.write_string(row, 0, f"{prop['name']}: {prop['value']}")
+                row += 1
+
+        # Index entries sheet
+        ws = workbook.add_worksheet("Index")
+        ws.set_column('A:A', 40)
+        ws.set_column('B:B', 60)
+        ws.write_row(0, 0, ["Term", "References"], header_fmt)
+
+        row = 1
+        for first_letter, group in _group_by_letter(entries):
+            ws.merge_range(row, 0, row, 1, first_letter, letter_fmt)
+            row += 1
+            for term, references in group:
+                ws.write_row(row, 0, (term, ", ".join(references)))
+                row += 1
+
+        workbook.close()
+        return True
+
+    def _notes_excel_xlsxwriter(self, xlsxwriter, notes: List[Tuple[str, str]],
+                                output_path: str) -> bool:
+        """
+        Write sorted notes with xlsxwriter
+        Same layout as the openpyxl writer in format_notes_excel
+        """
+        workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True,
+                                                     'strings_to_numbers': False,
+                                                     'strings_to_formulas': False,
+                                                     'strings_to_urls': False})
+        header_fmt = workbook.add_format({'bold': True, 'bg_color': '#E2E8F0'})
+        wrap_fmt = workbook.add_format({'text_wrap': True, 'valign': 'top'})
+
+        ws = workbook.add_worksheet("Notes")
+        ws.set_column('A:A', 30)
+        ws.set_column('B:B', 80, wrap_fmt)
+        ws.write_row(0, 0, ["Term", "Notes"], header_fmt)
+
+        # Note cells pick up the wrap format from column B
+        for row, term_note in enumerate(notes, 1):
+            ws.write_row(row, 0, term_note)
+
+        workbook.close()
+        return True
+
+    @staticmethod
+    def _write_xlsx_fast(sheets, output_path: str) -> bool:
+        """
+        Write plain sheets with pyexcelerate, one call per sheet
+        sheets() returns a list of (name, rows, column widths, 1-based bold row numbers);
+        it is only called once pyexcelerate has imported, so the row lists aren't built
+        for nothing when the streaming backends are used instead
+        Returns False if pyexcelerate is not installed
+        """
+        try:
+            from pyexcelerate import Workbook, Style, Font
+        except ImportError:
+            return False
+
+        wb = Workbook()
+        bold = Style(font=Font(bold=True))
+        for name, rows, col_widths, bold_rows in sheets():
+            ws = wb.new_sheet(name, data=rows)
+            for col, width in enumerate(col_widths, 1):
+                ws.set_col_style(col, Style(size=width))
+            for row in bold_rows:
+                ws.set_row_style(row, bold)
+        wb.save(output_path)
+        return True
@@ -0,0 +1,17 @@
+"""
+Gunicorn settings for Page Sage: gunicorn -c gunicorn_conf.py wsgi:application
+"""
+import os
+
+bind = os.environ.get('PAGESAGE_BIND', '127.0.0.1:5000')
+
+# One process, many threads: AI enrichment jobs and their executors live in the process,
+# so polling /api/ai/enrich/<job_id> on another worker would never find the job.
+# Each thread gets its own SQLite connection, and WAL lets them read concurrently.
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('PAGESAGE_THREADS', 8))
+
+# Import the app (and generate its session key) once, before the worker starts
+preload_app = True
+timeout = 120
@@ -6,13 +6,15 @@ A tool for creating and managing book indexes offline.
 """
 import argparse
 import sys
+from functools import lru_cache
+from itertools import groupby
 from pathlib import Path
 
-from database import IndexDatabase
-from formatter import IndexFormatter
+# database and formatter are imported inside the commands so --help stays fast
 
 def add_command(args):
     """Add a new index entry"""
+    from database import IndexDatabase
     db = IndexDatabase(args.database)
     
     try:
@@ -27,6 +29,7 @@ def add_command(args):
 
 def list_command(args):
     """List all index entries"""
+    from database import IndexDatabase
     db = IndexDatabase(args.database)
     entries = db.get_all_entries()
     
@@ -34,23 +37,18 @@ def list_command(args):
         print("No entries in index.")
         return
     
-    current_letter = None
-    for term, references in entries:
-        first_letter = term[0].upper()
-        if first_letter != current_letter:
-            if current_letter is not None:
-                print()
-            print(f"\n{first_letter}")
-            print("-" * 40)
-            current_letter = first_letter
-        
-        ref_str = ", ".join(references)
-        print(f"  {term}: {ref_str}")
-    
-    print(f"\nTotal: {len(entries)} entries")
+    # Build the listing in memory and write it once rather than printing line by line
+    parts = []
+    for letter, group in groupby(entries, key=lambda entry: entry[0][:1].upper()):
+        parts.append(f"\n\n{letter}" if parts else f"\n{letter}")
+        parts.append("-" * 40)
+        parts.extend(f"  {term}: {', '.join(references)}" for term, references in group)
+    parts.append(f"\nTotal: {len(entries)} entries\n")
+    sys.stdout.write("\n".join(parts))
 
 def search_command(args):
     """Search for index entries"""
+    from database import IndexDatabase
     db = IndexDatabase(args.database)
     entries = db.search_terms(args.pattern)
     
@@ -66,6 +64,7 @@ def search_command(args):
 
 def delete_command(args):
     """Delete an index entry"""
+    from database import IndexDatabase
     db = IndexDatabase(args.database)
     
     try:
@@ -83,6 +82,7 @@ def delete_command(args):
 
 def update_command(args):
     """Update an index entry reference"""
+    from database import IndexDatabase
     db = IndexDatabase(args.database)
     
     try:
@@ -95,64 +95,52 @@ def update_command(args):
         print(f"✗ Error: {e}", file=sys.stderr)
         sys.exit(1)
 
+# Text export formats: CLI format name -> IndexFormatter method
+TEXT_FORMATS = {
+    'latex': 'format_latex_style',
+    'markdown': 'format_markdown',
+    'plain': 'format_plain_text',
+}
+
 def export_command(args):
     """Export index to file"""
+    from database import IndexDatabase
+    from formatter import IndexFormatter
     db = IndexDatabase(args.database)
     formatter = IndexFormatter()
     
     entries = db.get_all_entries()
+    metadata = {'index_name': args.title, 'books': [], 'custom_properties': []}
     
     if not entries:
         print("⚠ Warning: Index is empty", file=sys.stderr)
     
-    # Choose format
-    if args.format == 'latex':
-        content = formatter.format_latex_style(entries, args.title)
-        # Write to file
+    if args.format == 'pdf':
         try:
-            Path(args.output).write_text(content, encoding='utf-8')
-            print(f"✓ Index exported to: {args.output}")
-            print(f"  Format: {args.format}")
-            print(f"  Entries: {len(entries)}")
-        except IOError as e:
-            print(f"✗ Error writing file: {e}", file=sys.stderr)
-            sys.exit(1)
-    elif args.format == 'markdown':
-        content = formatter.format_markdown(entries, args.title)
-        try:
-            Path(args.output).write_text(content, encoding='utf-8')
-            print(f"✓ Index exported to: {args.output}")
-            print(f"  Format: {args.format}")
-            print(f"  Entries: {len(entries)}")
-        except IOError as e:
-            print(f"✗ Error writing file: {e}", file=sys.stderr)
-            sys.exit(1)
-    elif args.format == 'pdf':
-        try:
-            success = formatter.format_pdf(entries, args.output, args.title)
-            if success:
-                print(f"✓ Index exported to: {args.output}")
-                print(f"  Format: {args.format}")
-                print(f"  Entries: {len(entries)}")
-            else:
-                print(f"✗ Error: PDF export failed. Make sure reportlab is installed:", file=sys.stderr)
-                print(f"  pip install reportlab", file=sys.stderr)
-                sys.exit(1)
+            success = formatter.format_pdf(entries, args.output, metadata)
         except Exception as e:
             print(f"✗ Error creating PDF: {e}", file=sys.stderr)
             sys.exit(1)
-    else:  # plain
-        content = formatter.format_plain_text(entries, args.title)
+        if not success:
+            print(f"✗ Error: PDF export failed. Make sure reportlab is installed:", file=sys.stderr)
+            print(f"  pip install reportlab", file=sys.stderr)
+            sys.exit(1)
+    else:
+        content = getattr(formatter, TEXT_FORMATS[args.format])(entries, metadata)
         try:
-            Path(args.output).write_text(content, encoding='utf-8')
-            print(f"✓ Index exported to: {args.output}")
-            print(f"  Format: {args.format}")
-            print(f"  Entries: {len(entries)}")
-        except IOError as e:
+            # Encode once and write bytes, skipping the text-mode wrapper
+            Path(args.output).write_bytes(content.encode('utf-8'))
+        except OSError as e:
             print(f"✗ Error writing file: {e}", file=sys.stderr)
             sys.exit(1)
+    
+    print(f"✓ Index exported to: {args.output}")
+    print(f"  Format: {args.format}")
+    print(f"  Entries: {len(entries)}")
 
-def main():
+@lru_cache(maxsize=1)
+def _build_parser():
+    """Build the argument parser once per process"""
     parser = argparse.ArgumentParser(
         description='Book Index - Manage and create book indexes offline',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -241,7 +229,10 @@ Examples:
                               help='Index title (default: Index)')
     export_parser.set_defaults(func=export_command)
     
-    args = parser.parse_args()
+    return parser
+
+def main():
+    args = _build_parser().parse_args()
     args.func(args)
 
 if __name__ == '__main__':
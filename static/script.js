@@ -3847,9 +3847,22 @@ async function enrichTermsWithApi() {
             body: JSON.stringify({})
         });
 
-        const data = await response.json();
+        let data = await response.json();
+
+        // The server enriches in the background; poll the job until it finishes
+        let ok = response.ok;
+        const jobId = data.job_id;
+        while (ok && jobId && data.status === 'running') {
+            if (data.total > 1) {
+                btn.textContent = `Enriching... ${data.completed}/${data.total}`;
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            const statusResponse = await fetch(`/api/ai/enrich/${jobId}`);
+            ok = statusResponse.ok;
+            data = await statusResponse.json();
+        }
 
-        if (response.ok) {
+        if (ok) {
             messageDiv.className = 'message success show';
             messageDiv.textContent = data.message;
             setTimeout(() => {
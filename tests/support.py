@@ -0,0 +1,29 @@
+"""
+Import web_app once per test run, inside a scratch working directory
+"""
+import atexit
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_web_app = None
+
+
+def import_web_app():
+    """web_app creates databases/ and its secret key in the working directory on import"""
+    global _web_app
+    if _web_app is None:
+        cwd = os.getcwd()
+        tmp = tempfile.TemporaryDirectory()
+        os.chdir(tmp.name)
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        import web_app
+
+        def cleanup():
+            web_app.db_manager.close_all()
+            os.chdir(cwd)
+            tmp.cleanup()
+        atexit.register(cleanup)
+        _web_app = web_app
+    return _web_app
@@ -0,0 +1,49 @@
+"""
+Finished AI enrichment jobs that are never polled are evicted after ENRICH_JOB_TTL
+
+Run with: python -m unittest discover tests
+"""
+import unittest
+from unittest import mock
+
+from support import import_web_app
+
+try:
+    import flask  # noqa: F401
+except ImportError:
+    flask = None
+
+
+@unittest.skipIf(flask is None, "needs flask")
+class EnrichJobEvictionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.web_app = import_web_app()
+
+    def finish(self, job_id, at):
+        web_app = self.web_app
+        with mock.patch.object(web_app.time, 'monotonic', return_value=at):
+            # An empty prompt list fails fast and records the job as finished
+            web_app._run_enrichment(job_id, None, None, 'anthropic', [])
+
+    def test_unpolled_job_expires(self):
+        web_app = self.web_app
+        self.finish('old', at=1000.0)
+        self.assertIn('old', web_app._enrich_jobs)
+
+        self.finish('new', at=1000.0 + web_app.ENRICH_JOB_TTL + 1)
+        self.assertNotIn('old', web_app._enrich_jobs)
+        self.assertNotIn('old', web_app._enrich_finished)
+        self.assertIn('new', web_app._enrich_jobs)
+
+    def test_polled_job_is_forgotten(self):
+        web_app = self.web_app
+        self.finish('polled', at=5000.0)
+        response = web_app.app.test_client().get('/api/ai/enrich/polled')
+        self.assertIn(response.status_code, (200, 500))
+        self.assertNotIn('polled', web_app._enrich_jobs)
+        self.assertNotIn('polled', web_app._enrich_finished)
+
+
+if __name__ == '__main__':
+    unittest.main()
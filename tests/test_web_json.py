@@ -0,0 +1,45 @@
+"""
+JSON responses with orjson installed: jsonify() goes through ORJSONProvider.response()
+
+Run with: python -m unittest discover tests
+"""
+import unittest
+
+from support import import_web_app
+
+try:
+    import flask  # noqa: F401
+    import orjson  # noqa: F401
+except ImportError:
+    orjson = None
+
+
+@unittest.skipIf(orjson is None, "needs flask and orjson")
+class ORJSONProviderTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.web_app = import_web_app()
+        cls.client = cls.web_app.app.test_client()
+
+    def test_provider_is_orjson(self):
+        self.assertEqual(type(self.web_app.app.json).__name__, 'ORJSONProvider')
+
+    def test_jsonify_routes(self):
+        response = self.client.post('/api/databases/create', json={'index_name': 'Test'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertTrue(response.get_json()['success'])
+
+        response = self.client.get('/api/databases/list')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Test', [db['index_name'] for db in response.get_json()['databases']])
+
+    def test_api_error_is_json(self):
+        # api_error itself responds through jsonify()
+        response = self.client.post('/api/add', json={'term': 'x', 'reference': 'not a reference'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.get_json())
+
+
+if __name__ == '__main__':
+    unittest.main()
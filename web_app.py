@@ -1,29 +1,293 @@
 """
 Web interface for Book Index application
 """
-from flask import Flask, render_template, request, jsonify, send_file, session
-from database import IndexDatabase, DatabaseManager, sanitize_db_name
+from flask import Flask, render_template, request, jsonify, send_file, session, Response, stream_with_context, g
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import HTTPException, InternalServerError
+from database import IndexDatabase, DatabaseManager, sanitize_db_name, safe_file_stem, parse_page_range
 from formatter import IndexFormatter
 from pathlib import Path
-import tempfile
+import io
+import csv
 from datetime import datetime
 import re
 import os
 import shutil
-import sqlite3
+import atexit
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from functools import lru_cache, wraps
+from urllib.parse import quote
+import gzip
+import itertools
+import json
+import zlib
+import weakref
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
-app.secret_key = os.environ.get('FLASK_SECRET_KEY', os.urandom(24))
+
+if orjson is not None:
+    class ORJSONProvider(JSONProvider):
+        """Route jsonify() and request.json through orjson"""
+        # The base JSONProvider has no mimetype (only DefaultJSONProvider does)
+        mimetype = 'application/json'
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+        def response(self, *args, **kwargs):
+            # Hand orjson's bytes straight to the response instead of decoding to str first
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+                                            mimetype=self.mimetype)
+
+    app.json = ORJSONProvider(app)
+else:
+    # Skip key sorting and indentation in the stdlib encoder
+    app.json.sort_keys = False
+    app.json.compact = True
+
+def load_secret_key(path=Path('databases') / '.secret_key'):
+    """
+    FLASK_SECRET_KEY if set, otherwise a random key generated on first run and kept in
+    a private file, so session cookies (the active database) survive restarts
+    """
+    key = os.environ.get('FLASK_SECRET_KEY')
+    if key:
+        return key
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    key = os.urandom(32)
+    path.parent.mkdir(exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another process created it first
+        return path.read_bytes()
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+app.secret_key = load_secret_key()
+app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+# Match '/api/gap-analysis/' as '/api/gap-analysis' instead of redirecting (an extra round trip)
+app.url_map.strict_slashes = False
+# Largest accepted request body (database uploads); PAGESAGE_MAX_UPLOAD_MB overrides the 512 MB default
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('PAGESAGE_MAX_UPLOAD_MB', 512)) * 1024 * 1024
+# Behind a server that honours X-Sendfile (Apache mod_xsendfile, lighttpd), let it send
+# database backups straight from disk instead of streaming them through Python
+app.config['USE_X_SENDFILE'] = bool(os.environ.get('PAGESAGE_X_SENDFILE'))
 
 # Initialize database manager
 db_manager = DatabaseManager()
+# Close connections on exit so SQLite folds each WAL back into its database file
+atexit.register(db_manager.close_all)
 formatter = IndexFormatter()
+# Distinguishes ETags across server restarts (database versions start again at 0)
+BOOT_ID = os.urandom(4).hex()
+
+
+# Pre-encoded {key: []} bodies for list views when there is no database yet
+EMPTY_LIST_BODIES = {key: b'{"%s":[]}' % key.encode() for key in ('entries', 'notes', 'properties', 'books')}
+
+
+def empty_list_response(key):
+    """{key: []} response from EMPTY_LIST_BODIES (a new Response each time, as hooks modify it)"""
+    return Response(EMPTY_LIST_BODIES[key], mimetype='application/json')
+
+
+# Lists with more rows than this are serialized and sent in chunks instead of in one go
+STREAM_MIN_ROWS = 5000
+
+
+def _dump_json(obj) -> bytes:
+    """Compact JSON bytes through app.json, the same serializer as jsonify()"""
+    return app.json.dumps(obj).encode('utf-8')
+
+
+def streamed_json_list(key, items, to_row, chunk_size=1000):
+    """
+    Response with the body {key: [to_row(item), ...]}, built and sent chunk_size rows
+    at a time (gzip-compressed as it goes when the client accepts it)
+    """
+    def generate():
+        yield b'{"' + key.encode('utf-8') + b'":['
+        for start in range(0, len(items), chunk_size):
+            rows = _dump_json([to_row(item) for item in items[start:start + chunk_size]])
+            yield (b',' if start else b'') + rows[1:-1]
+        yield b']}'
+
+    return streamed_response(generate(), 'application/json')
+
+
+def streamed_response(chunks, mimetype):
+    """
+    Streamed response from an iterator of bytes, gzip-compressed chunk by chunk when the
+    client accepts it (compress_response only handles complete bodies)
+    """
+    headers = {}
+    if request.accept_encodings['gzip']:
+        compressor = zlib.compressobj(4, zlib.DEFLATED, 31)  # wbits=31: gzip container
+        chunks = _compress_chunks(chunks, compressor)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+def _compress_chunks(chunks, compressor):
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def entries_payload(entries):
+    """
+    Entries list for JSON, as [{'term', 'references'}] rows
+    or, with ?format=columns, as parallel 'terms' / 'references' lists
+    """
+    if request.args.get('format') == 'columns':
+        return {
+            'terms': [term for term, _ in entries],
+            'references': [refs for _, refs in entries]
+        }
+    return {'entries': [{'term': term, 'references': refs} for term, refs in entries]}
+
+
+def json_body():
+    """
+    The request's JSON object, parsed once per request; {} when the body is missing
+    or is not JSON, so views report their own missing-field errors instead of a 415
+    """
+    return request.get_json(silent=True) or {}
+
+
+# Encoded {'entries': [...]} body per database as (version, bytes), reused until the next write
+_entries_bodies = weakref.WeakKeyDictionary()
+
+
+def entries_response(db):
+    """
+    All entries as {'entries': [{'term', 'references'}]}, from the cached encoded body
+    when the database is unchanged (other clients and tabs get it without re-encoding);
+    lists too large to hold as one body are streamed instead
+    """
+    version = db.data_version()
+    cached = _entries_bodies.get(db)
+    if cached is not None and cached[0] == version:
+        return Response(cached[1], mimetype='application/json')
+
+    entries = db.get_all_entries()
+    if len(entries) > STREAM_MIN_ROWS:
+        return streamed_entries(entries)
+    body = _dump_json({'entries': [{'term': term, 'references': refs} for term, refs in entries]})
+    _entries_bodies[db] = (version, body)
+    return Response(body, mimetype='application/json')
+
+
+def streamed_entries(entries):
+    """Streamed {'entries': [{'term', 'references'}]} response, for lists over STREAM_MIN_ROWS"""
+    return streamed_json_list(
+        'entries', entries, lambda entry: {'term': entry[0], 'references': entry[1]})
+
+
+def json_fields(*required, optional=(), error):
+    """
+    Read the named fields from the JSON body once, stripped, and pass them to the view
+    as keyword arguments; responds 400 with `error` if a required field is empty
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            data = json_body()
+            for field in required + tuple(optional):
+                value = data.get(field)
+                kwargs[field] = str(value).strip() if value is not None else ''
+            if not all(kwargs[field] for field in required):
+                return jsonify({'error': error}), 400
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def db_etag(db):
+    """
+    Weak ETag for a response computed only from db and the query string; it changes
+    whenever the database is written to, by this process or another
+    """
+    version = zlib.crc32(repr(db.data_version()).encode())
+    return f"{BOOT_ID}-{id(db):x}-{version:x}-{zlib.crc32(request.query_string):x}"
+
+
+def not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    return response
+
+
+# Page size for /api/entries and /api/search when only ?cursor= is given, and the largest allowed
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 5000
+
+
+def page_args():
+    """
+    Optional keyset pagination from ?limit= and ?cursor= (the last term of the previous page)
+    Returns (limit, cursor), (None, None) when not paginating, or raises ValueError
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor') or None
+    if limit is None and cursor is None:
+        return None, None
+    try:
+        limit = int(limit) if limit is not None else DEFAULT_PAGE_SIZE
+    except ValueError:
+        raise ValueError("limit must be a number")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit, cursor
+
+
+def paged_payload(entries, limit):
+    """entries_payload plus next_cursor: the term to pass as ?cursor= for the next page, or None"""
+    payload = entries_payload(entries)
+    payload['next_cursor'] = entries[-1][0] if len(entries) == limit else None
+    return payload
 
 
 def get_current_db():
     """Get the active database for the current session. Returns None if no database exists."""
     db_name = session.get('active_database', None)
 
+    # Resolved at most once per request, unless the handler has since switched databases
+    cached = g.get('current_db')
+    if cached is not None and cached[0] == db_name:
+        return cached[1]
+    db = _resolve_current_db(db_name)
+    g.current_db = (session.get('active_database', None), db)
+    return db
+
+
+def _resolve_current_db(db_name):
+    """Find the session's database, falling back to a legacy or first available one"""
     # Check if the session's database actually exists
     if db_name:
         db_path = db_manager.databases_dir / db_name
@@ -43,9 +307,11 @@ def get_current_db():
             # Check if any databases exist
             databases = db_manager.list_databases()
             if databases:
-                # Use the first available database
+                # Use the first available database (only touch the session when it changes,
+                # as every write re-signs the cookie)
                 db_name = databases[0]['db_name']
-                session['active_database'] = db_name
+                if session.get('active_database') != db_name:
+                    session['active_database'] = db_name
             else:
                 # No databases exist - don't create one automatically
                 return None
@@ -71,8 +337,10 @@ def migrate_legacy_database():
         new_name = sanitize_db_name(index_name)
         new_path = db_manager.databases_dir / new_name
 
-        # Copy database to new location
-        shutil.copy2(str(legacy_path), str(new_path))
+        # Fold any WAL content into the file and close it, then copy it to the new location
+        legacy_db.checkpoint()
+        legacy_db.close()
+        shutil.copyfile(legacy_path, new_path)
 
         # Rename legacy to .bak
         backup_path = legacy_path.with_suffix('.db.bak')
@@ -88,12 +356,59 @@ def migrate_legacy_database():
         print(f"Error migrating legacy database: {e}")
         # Don't set any default - let user create via Get Started modal
 
-# Add CORS headers to all responses
+# CORS headers added to all responses, built once
+CORS_HEADERS = (
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Headers', 'Content-Type,Authorization'),
+    ('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS'),
+)
+
+@app.before_request
+def answer_preflight():
+    """Answer CORS preflight requests without running the view"""
+    if request.method == 'OPTIONS':
+        return Response(status=204)
+
 @app.after_request
 def after_request(response):
-    response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-    response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
+    response.headers.update(CORS_HEADERS)
+    return response
+
+@app.errorhandler(Exception)
+def api_error(e):
+    """Uncaught errors in /api/ views become the usual {'error': ...} 400 response"""
+    if isinstance(e, HTTPException):
+        return e
+    if not request.path.startswith('/api/'):
+        return InternalServerError(original_exception=e)
+    return jsonify({'error': str(e)}), 400
+
+# Responses smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+@app.after_request
+def compress_response(response):
+    """Brotli- or gzip-compress JSON and text bodies when the client accepts it"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code != 200 or 'Content-Encoding' in response.headers
+            or not (response.mimetype == 'application/json' or response.mimetype.startswith('text/'))):
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        encoding, compress = 'br', lambda body: brotli.compress(body, quality=4)
+    elif accepted['gzip']:
+        encoding, compress = 'gzip', lambda body: gzip.compress(body, compresslevel=4)
+    else:
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(compress(body))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
     return response
 
 @app.route('/')
@@ -126,16 +441,20 @@ def list_databases():
     """List all available databases"""
     databases = db_manager.list_databases()
     active_db = session.get('active_database', None)
-    return jsonify({
+    response = jsonify({
         'databases': databases,
         'active': active_db
     })
+    # No version counter covers the directory, so tag the body itself; an unchanged
+    # list is answered with an empty 304
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
 
 
 @app.route('/api/databases/switch', methods=['POST'])
 def switch_database():
     """Switch active database"""
-    data = request.json
+    data = json_body()
     db_name = data.get('db_name')
 
     if not db_name:
@@ -186,20 +505,13 @@ def import_database():
 @app.route('/api/databases/create', methods=['POST'])
 def create_database():
     """Create a new database"""
-    data = request.json
+    data = json_body()
     index_name = data.get('index_name', 'Book Index')
 
-    db_name = sanitize_db_name(index_name)
+    # Add a suffix if a database with this name already exists
+    db_name = db_manager.unused_db_name(sanitize_db_name(index_name))
     db_path = db_manager.databases_dir / db_name
 
-    # Check if database already exists, add suffix if needed
-    counter = 2
-    while db_path.exists():
-        base_name = sanitize_db_name(index_name).replace('.db', '')
-        db_name = f"{base_name}_{counter}.db"
-        db_path = db_manager.databases_dir / db_name
-        counter += 1
-
     # Create new database
     new_db = IndexDatabase(str(db_path))
     new_db.set_setting('index_name', index_name)
@@ -219,19 +531,14 @@ def load_demo_database():
     if not demo_path.exists():
         return jsonify({'error': 'Demo database not found'}), 404
 
-    # Copy demo to databases folder with unique name
-    db_name = 'index_CISSP_Study_Guide.db'
+    # Copy demo to databases folder with unique name (suffixed if the demo is already loaded)
+    db_name = db_manager.unused_db_name('index_CISSP_Study_Guide.db')
     db_path = db_manager.databases_dir / db_name
 
-    # If demo already exists, add suffix
-    counter = 2
-    while db_path.exists():
-        db_name = f'index_CISSP_Study_Guide_{counter}.db'
-        db_path = db_manager.databases_dir / db_name
-        counter += 1
-
     try:
-        shutil.copy(str(demo_path), str(db_path))
+        # A real copy, not a link: the demo file itself must stay pristine.
+        # copyfile skips the permission copy and uses the kernel's sendfile where available
+        shutil.copyfile(demo_path, db_path)
         session['active_database'] = db_name
 
         return jsonify({
@@ -288,18 +595,37 @@ def get_entries():
     """Get all entries"""
     db = get_current_db()
     if db is None:
-        return jsonify({'entries': []})
-    entries = db.get_all_entries()
-    return jsonify({
-        'entries': [{'term': term, 'references': refs} for term, refs in entries]
-    })
+        if request.args.get('format') == 'columns':
+            return jsonify(entries_payload([]))
+        return empty_list_response('entries')
+    try:
+        limit, cursor = page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Entries only change when the database is written to, so let the browser revalidate
+    etag = db_etag(db)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
+    if limit is not None:
+        response = jsonify(paged_payload(db.get_entries_page(limit, cursor), limit))
+        response.set_etag(etag, weak=True)
+        return response
+
+    if request.args.get('format') == 'columns':
+        response = jsonify(entries_payload(db.get_all_entries()))
+    else:
+        response = entries_response(db)
+    response.set_etag(etag, weak=True)
+    return response
 
 @app.route('/api/entries/recent', methods=['GET'])
 def get_recent_entries():
     """Get most recent entries"""
     db = get_current_db()
     if db is None:
-        return jsonify({'entries': []})
+        return empty_list_response('entries')
     limit = request.args.get('limit', 5, type=int)
     entries = db.get_recent_entries(limit)
     return jsonify({
@@ -307,25 +633,15 @@ def get_recent_entries():
     })
 
 @app.route('/api/add', methods=['POST'])
-def add_entry():
+@json_fields('term', 'reference', optional=('notes',), error='Term and reference are required')
+def add_entry(term, reference, notes):
     """Add a new entry"""
     db = get_current_db()
-    data = request.json
-    term = data.get('term', '').strip()
-    reference = data.get('reference', '').strip()
-    notes = data.get('notes', '').strip()
-
-    if not term or not reference:
-        return jsonify({'error': 'Term and reference are required'}), 400
 
     try:
-        added = db.add_entry(term, reference)
-
-        # Update notes if provided
-        notes_added = False
-        if notes:
-            db.update_notes(term, notes)
-            notes_added = True
+        # Reference and notes (if provided) are written in one transaction
+        added = db.add_entry(term, reference, notes)
+        notes_added = bool(notes)
 
         if added:
             # Build message based on what was added
@@ -339,29 +655,51 @@ def add_entry():
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
 
+# Search patterns outside this length range return no results: a single character matches
+# most of the index, and the max is a request-size guard that keeps a pasted wall of text
+# out of the substring scan over every term (terms themselves have no length limit)
+MIN_SEARCH_LENGTH = 2
+MAX_SEARCH_LENGTH = 200
+# Largest CSV body accepted by the import endpoint
+MAX_IMPORT_SIZE = 10_000_000
+
 @app.route('/api/search', methods=['GET'])
 def search_entries():
     """Search for entries"""
     db = get_current_db()
-    pattern = request.args.get('q', '')
-    if not pattern:
-        return jsonify({'entries': []})
+    pattern = request.args.get('q', '').strip()
+    try:
+        limit, cursor = page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    entries = db.search_terms(pattern)
-    return jsonify({
-        'entries': [{'term': term, 'references': refs} for term, refs in entries]
-    })
+    # No database, or a pattern that can't usefully match: nothing to look up or tag
+    if db is None or not MIN_SEARCH_LENGTH <= len(pattern) <= MAX_SEARCH_LENGTH:
+        if limit is not None:
+            return jsonify(paged_payload([], limit))
+        return jsonify(entries_payload([]))
+
+    # Results only change when the database is written to, as with /api/entries
+    etag = db_etag(db)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
+    entries = db.search_terms(pattern, limit, cursor)
+    if limit is not None:
+        response = jsonify(paged_payload(entries, limit))
+    elif len(entries) > STREAM_MIN_ROWS and request.args.get('format') != 'columns':
+        response = streamed_entries(entries)
+    else:
+        response = jsonify(entries_payload(entries))
+    response.set_etag(etag, weak=True)
+    return response
 
 @app.route('/api/delete', methods=['POST'])
-def delete_entry():
+@json_fields('term', optional=('reference',), error='Term is required')
+def delete_entry(term, reference):
     """Delete an entry"""
     db = get_current_db()
-    data = request.json
-    term = data.get('term', '').strip()
-    reference = data.get('reference', '').strip() if data.get('reference') else None
-
-    if not term:
-        return jsonify({'error': 'Term is required'}), 400
+    reference = reference or None
 
     try:
         deleted = db.delete_entry(term, reference)
@@ -377,22 +715,16 @@ def delete_entry():
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/update', methods=['POST'])
-def update_entry():
+@json_fields('term', 'old_reference', 'new_reference', optional=('old_term',),
+             error='Term, old reference, and new reference are required')
+def update_entry(term, old_reference, new_reference, old_term):
     """Update a reference"""
     db = get_current_db()
-    data = request.json
-    term = data.get('term', '').strip()
-    old_term = data.get('old_term', '').strip()
-    old_reference = data.get('old_reference', '').strip()
-    new_reference = data.get('new_reference', '').strip()
 
     # If old_term not provided, assume term hasn't changed
     if not old_term:
         old_term = term
 
-    if not term or not old_reference or not new_reference:
-        return jsonify({'error': 'Term, old reference, and new reference are required'}), 400
-
     try:
         # If term has changed, delete old reference and add new one
         if old_term.lower() != term.lower():
@@ -416,56 +748,52 @@ def update_entry():
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/import', methods=['POST'])
-def import_csv():
+@json_fields('csv_data', error='No CSV data provided')
+def import_csv(csv_data):
     """Import entries from CSV data"""
     db = get_current_db()
-    data = request.json
-    csv_data = data.get('csv_data', '').strip()
 
-    if not csv_data:
-        return jsonify({'error': 'No CSV data provided'}), 400
+    if len(csv_data) > MAX_IMPORT_SIZE:
+        return jsonify({'error': 'CSV data too large'}), 413
 
-    lines = csv_data.split('\n')
-    imported = 0
-    skipped = 0
     errors = []
-
-    for line_num, line in enumerate(lines, 1):
-        line = line.strip()
-        if not line:
+    parsed = []
+
+    # Validate every line first, then write all references in one transaction.
+    # One reader over all stripped lines; blank lines come back as empty rows
+    reader = csv.reader(line.strip() for line in csv_data.split('\n'))
+    for parts in reader:
+        line_num = reader.line_num
+        if not parts:
             continue
 
-        # Parse CSV line (simple comma split)
-        parts = line.split(',')
         if len(parts) < 2:
             errors.append(f"Line {line_num}: Invalid format (expected: term,reference1,reference2,...)")
             continue
 
         term = parts[0].strip()
-        references = [ref.strip() for ref in parts[1:]]
+        # A quoted field may hold several references ("1:2, 1:5"), as in our own CSV export
+        references = [ref for ref in (ref.strip() for field in parts[1:] for ref in field.split(','))
+                      if ref]
 
         if not term:
             errors.append(f"Line {line_num}: Missing term")
             continue
 
-        if not any(references):
+        if not references:
             errors.append(f"Line {line_num}: Missing references")
             continue
 
         # Process each reference for this term
         for ref in references:
-            if not ref:
-                continue
-
             try:
-                added = db.add_entry(term, ref)
-                if added:
-                    imported += 1
-                else:
-                    skipped += 1
+                parsed.append((term,) + db.parse_reference(ref))
             except ValueError as e:
                 errors.append(f"Line {line_num} (ref: {ref}): {str(e)}")
 
+    imported = db.add_entries_bulk(parsed)
+    skipped = len(parsed) - imported
+
     return jsonify({
         'success': True,
         'message': f'Import complete: {imported} imported, {skipped} skipped (duplicates), {len(errors)} errors',
@@ -475,19 +803,18 @@ def import_csv():
     })
 
 @app.route('/api/import/notes', methods=['POST'])
-def import_notes():
+@json_fields('csv_data', error='No CSV data provided')
+def import_notes(csv_data):
     """Import notes from CSV data"""
     db = get_current_db()
-    data = request.json
-    csv_data = data.get('csv_data', '').strip()
-
-    if not csv_data:
-        return jsonify({'error': 'No CSV data provided'}), 400
 
     lines = csv_data.split('\n')
     imported = 0
     updated = 0
     errors = []
+    parsed = []
+    # Lowercased terms already in the index, plus those added earlier in this import
+    existing = {term.lower() for term in db.get_term_names()}
 
     for line_num, line in enumerate(lines, 1):
         line = line.strip()
@@ -512,23 +839,16 @@ def import_notes():
             errors.append(f"Line {line_num}: Missing note")
             continue
 
-        try:
-            # Check if term exists
-            with sqlite3.connect(db.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT id, notes FROM terms WHERE term = ? COLLATE NOCASE', (term,))
-                result = cursor.fetchone()
-
-            if result:
-                # Term exists - overwrite note
-                db.update_notes(term, note)
-                updated += 1
-            else:
-                # Term doesn't exist - create it with the note
-                db.update_notes(term, note)
-                imported += 1
-        except Exception as e:
-            errors.append(f"Line {line_num}: {str(e)}")
+        # Existing terms get their note overwritten, new ones are created with it
+        if term.lower() in existing:
+            updated += 1
+        else:
+            imported += 1
+            existing.add(term.lower())
+        parsed.append((term, note))
+
+    # Validate every line first, then write all notes in one transaction
+    db.update_notes_bulk(parsed)
 
     return jsonify({
         'success': True,
@@ -543,22 +863,27 @@ def get_notes():
     """Get all notes"""
     db = get_current_db()
     if db is None:
-        return jsonify({'notes': []})
+        return empty_list_response('notes')
+    # Notes only change when the database is written to, as with /api/entries
+    etag = db_etag(db)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
     notes = db.get_all_notes()
-    return jsonify({
-        'notes': [{'term': term, 'notes': note} for term, note in notes]
-    })
+    if len(notes) > STREAM_MIN_ROWS:
+        response = streamed_json_list('notes', notes, lambda row: {'term': row[0], 'notes': row[1]})
+    else:
+        response = jsonify({
+            'notes': [{'term': term, 'notes': note} for term, note in notes]
+        })
+    response.set_etag(etag, weak=True)
+    return response
 
 @app.route('/api/notes/update', methods=['POST'])
-def update_notes():
+@json_fields('term', optional=('notes',), error='Term is required')
+def update_notes(term, notes):
     """Update notes for a term"""
     db = get_current_db()
-    data = request.json
-    term = data.get('term', '').strip()
-    notes = data.get('notes', '').strip()
-
-    if not term:
-        return jsonify({'error': 'Term is required'}), 400
 
     try:
         db.update_notes(term, notes)
@@ -567,14 +892,10 @@ def update_notes():
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/notes/delete', methods=['POST'])
-def delete_notes():
+@json_fields('term', error='Term is required')
+def delete_notes(term):
     """Delete notes for a term"""
     db = get_current_db()
-    data = request.json
-    term = data.get('term', '').strip()
-
-    if not term:
-        return jsonify({'error': 'Term is required'}), 400
 
     try:
         deleted = db.delete_notes(term)
@@ -585,11 +906,49 @@ def delete_notes():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+def download_stem(index_name, book_number=None):
+    """Filename stem for a download: sanitized index name, plus _Book<n> for a single-book export"""
+    stem = safe_file_stem(index_name)
+    return f"{stem}_Book{book_number}" if book_number else stem
+
+def set_attachment(response, filename):
+    """Mark a streamed response as a download, with the same header send_file builds"""
+    ascii_name = filename.encode('ascii', 'ignore').decode('ascii')
+    response.headers.set('Content-Disposition', 'attachment', filename=ascii_name,
+                         **{'filename*': f"UTF-8''{quote(filename)}"})
+
+def send_export(content, mimetype, filename):
+    """
+    Send generated export content as a download straight from memory
+    content is str, bytes, or an iterator of str chunks, which is streamed as it is produced
+    """
+    if not isinstance(content, (str, bytes)):
+        response = streamed_response((chunk.encode('utf-8') for chunk in content), mimetype)
+        set_attachment(response, filename)
+        return response
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return send_file(io.BytesIO(content),
+                    mimetype=mimetype,
+                    as_attachment=True,
+                    download_name=filename)
+
+def books_metadata(db):
+    """Books with their custom properties, as export metadata expects them"""
+    return [
+        {
+            'book_number': book_number,
+            'book_name': book_name,
+            'page_count': page_count,
+            'metadata': [{'name': name, 'value': value} for name, value in properties]
+        }
+        for book_number, book_name, page_count, properties in db.get_books_with_properties()
+    ]
+
 @app.route('/api/notes/export/<format_type>')
 def export_notes(format_type):
     """Export notes in specified format"""
     db = get_current_db()
-    notes = db.get_all_notes()
 
     # Get book filter from query parameter
     book_filter = request.args.get('book', '')
@@ -600,38 +959,18 @@ def export_notes(format_type):
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
     # Gather metadata for PDF export (same as index export)
-    books = db.get_all_books()
     custom_properties = db.get_all_custom_properties()
+    books_with_metadata = books_metadata(db)
 
-    books_with_metadata = []
-    for b in books:
-        book_props = db.get_book_custom_properties(b[0])
-        books_with_metadata.append({
-            'book_number': b[0],
-            'book_name': b[1],
-            'page_count': b[2],
-            'metadata': [{'name': p[1], 'value': p[2]} for p in book_props]
-        })
-
-    # If filtering by specific book, filter notes to only include terms with references from that book
     selected_book_number = None
     if book_filter:
         selected_book_number = int(book_filter)
-        # Get all entries to check which terms have references in this book
-        entries = db.get_all_entries()
-        terms_in_book = set()
-        for term, references in entries:
-            for ref in references:
-                if ref.startswith(f"{selected_book_number}:"):
-                    terms_in_book.add(term.lower())
-                    break
-
-        # Filter notes to only include terms that have references in the selected book
-        notes = [(term, note) for term, note in notes if term.lower() in terms_in_book]
-
         # Filter metadata to only show the selected book (compare as int)
         books_with_metadata = [b for b in books_with_metadata if int(b['book_number']) == selected_book_number]
 
+    # Only terms with a reference in the selected book, if there is one
+    notes = db.get_all_notes(selected_book_number)
+
     metadata = {
         'index_name': index_name,
         'color_scheme': color_scheme,
@@ -641,66 +980,44 @@ def export_notes(format_type):
     }
 
     # Add book number to filename if filtering by specific book
-    if selected_book_number:
-        sanitized_name = re.sub(r'[^\w\s-]', '', index_name).strip().replace(' ', '_') + f"_Book{selected_book_number}"
-    else:
-        sanitized_name = re.sub(r'[^\w\s-]', '', index_name).strip().replace(' ', '_')
+    sanitized_name = download_stem(index_name, selected_book_number)
 
     if format_type == 'txt':
-        content = formatter.format_notes_text(notes)
+        content = formatter.iter_notes_text(notes)
         filename = f'{sanitized_name}_notes_{timestamp}.txt'
         mimetype = 'text/plain'
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False,
-                                               suffix='.txt', encoding='utf-8')
-        temp_file.write(content)
-        temp_file.close()
     elif format_type == 'csv':
-        content = formatter.format_notes_csv(notes)
+        content = formatter.iter_notes_csv(notes)
         filename = f'{sanitized_name}_notes_{timestamp}.csv'
         mimetype = 'text/csv'
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False,
-                                               suffix='.csv', encoding='utf-8')
-        temp_file.write(content)
-        temp_file.close()
     elif format_type == 'markdown':
-        content = formatter.format_notes_markdown(notes)
+        content = formatter.iter_notes_markdown(notes)
         filename = f'{sanitized_name}_notes_{timestamp}.md'
         mimetype = 'text/markdown'
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False,
-                                               suffix='.md', encoding='utf-8')
-        temp_file.write(content)
-        temp_file.close()
     elif format_type == 'latex':
-        content = formatter.format_notes_latex(notes)
+        content = formatter.iter_notes_latex(notes)
         filename = f'{sanitized_name}_notes_{timestamp}.tex'
         mimetype = 'text/plain'
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False,
-                                               suffix='.tex', encoding='utf-8')
-        temp_file.write(content)
-        temp_file.close()
     elif format_type == 'pdf':
         filename = f'{sanitized_name}_notes_{timestamp}.pdf'
         mimetype = 'application/pdf'
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-        temp_file.close()
-        success = formatter.format_notes_pdf(notes, temp_file.name, metadata)
+        output = io.BytesIO()
+        success = formatter.format_notes_pdf(notes, output, metadata)
         if not success:
             return jsonify({'error': 'PDF generation failed. Install reportlab: pip install reportlab'}), 500
+        content = output.getvalue()
     elif format_type == 'excel':
         filename = f'{sanitized_name}_notes_{timestamp}.xlsx'
         mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-        temp_file.close()
-        success = formatter.format_notes_excel(notes, temp_file.name)
+        output = io.BytesIO()
+        success = formatter.format_notes_excel(notes, output)
         if not success:
             return jsonify({'error': 'Excel generation failed. Install openpyxl: pip install openpyxl'}), 500
+        content = output.getvalue()
     else:
         return jsonify({'error': 'Invalid format type'}), 400
 
-    return send_file(temp_file.name,
-                    mimetype=mimetype,
-                    as_attachment=True,
-                    download_name=filename)
+    return send_export(content, mimetype, filename)
 
 @app.route('/api/export/<format_type>')
 def export_index(format_type):
@@ -714,35 +1031,20 @@ def export_index(format_type):
     # Gather index metadata
     index_name = db.get_setting('index_name') or 'Book Index'
     color_scheme = db.get_setting('color_scheme') or '#87AE73'
-    books = db.get_all_books()
     custom_properties = db.get_all_custom_properties()
-
-    books_with_metadata = []
-    for b in books:
-        book_props = db.get_book_custom_properties(b[0])
-        books_with_metadata.append({
-            'book_number': b[0],
-            'book_name': b[1],
-            'page_count': b[2],
-            'metadata': [{'name': p[1], 'value': p[2]} for p in book_props]
-        })
+    books_with_metadata = books_metadata(db)
 
     # If filtering by specific book, filter entries and metadata
     selected_book_number = None
     if book_filter:
         selected_book_number = int(book_filter)
-        # Filter entries to only include references from this book
-        filtered_entries = []
-        for term, references in entries:
-            book_refs = []
-            for ref in references:
-                if ref.startswith(f"{selected_book_number}:"):
-                    # Convert "book:page" to just "page" for single-book export
-                    page_part = ref.split(':', 1)[1]
-                    book_refs.append(page_part)
-            if book_refs:
-                filtered_entries.append((term, book_refs))
-        entries = filtered_entries
+        # Keep only this book's references, converting "book:page" to just "page"
+        prefix = f"{selected_book_number}:"
+        start = len(prefix)
+        entries = [
+            (term, book_refs) for term, references in entries
+            if (book_refs := [ref[start:] for ref in references if ref.startswith(prefix)])
+        ]
 
         # Filter metadata to only show the selected book (compare as int)
         books_with_metadata = [b for b in books_with_metadata if int(b['book_number']) == selected_book_number]
@@ -755,69 +1057,44 @@ def export_index(format_type):
         'single_book': bool(book_filter)
     }
 
-    # Create filename from index name and timestamp
-    base_name = re.sub(r'[^\w\s-]', '', index_name).strip().replace(' ', '_')
+    # Create filename from index name (plus book number if filtering by book) and timestamp
+    sanitized_name = download_stem(index_name, selected_book_number)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    # Add book number to filename if filtering by specific book
-    if selected_book_number:
-        sanitized_name = f"{base_name}_Book{selected_book_number}"
-    else:
-        sanitized_name = base_name
 
     if format_type == 'latex':
-        content = formatter.format_latex_style(entries, metadata)
+        content = formatter.iter_latex_style(entries, metadata)
         filename = f'{sanitized_name}_{timestamp}.tex'
         mimetype = 'text/plain'
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False,
-                                               suffix='.tex', encoding='utf-8')
-        temp_file.write(content)
-        temp_file.close()
     elif format_type == 'markdown':
-        content = formatter.format_markdown(entries, metadata)
+        content = formatter.iter_markdown(entries, metadata)
         filename = f'{sanitized_name}_{timestamp}.md'
         mimetype = 'text/markdown'
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False,
-                                               suffix='.md', encoding='utf-8')
-        temp_file.write(content)
-        temp_file.close()
     elif format_type == 'pdf':
         filename = f'{sanitized_name}_{timestamp}.pdf'
         mimetype = 'application/pdf'
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-        temp_file.close()
-        success = formatter.format_pdf(entries, temp_file.name, metadata)
+        output = io.BytesIO()
+        success = formatter.format_pdf(entries, output, metadata)
         if not success:
             return jsonify({'error': 'PDF generation failed. Install reportlab: pip install reportlab'}), 500
+        content = output.getvalue()
     elif format_type == 'csv':
-        content = formatter.format_csv(entries, metadata)
+        content = formatter.iter_csv(entries, metadata)
         filename = f'{sanitized_name}_{timestamp}.csv'
         mimetype = 'text/csv'
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False,
-                                               suffix='.csv', encoding='utf-8')
-        temp_file.write(content)
-        temp_file.close()
     elif format_type == 'excel':
         filename = f'{sanitized_name}_{timestamp}.xlsx'
         mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-        temp_file.close()
-        success = formatter.format_excel(entries, temp_file.name, metadata)
+        output = io.BytesIO()
+        success = formatter.format_excel(entries, output, metadata)
         if not success:
             return jsonify({'error': 'Excel generation failed. Install openpyxl: pip install openpyxl'}), 500
+        content = output.getvalue()
     else:  # plain
-        content = formatter.format_plain_text(entries, metadata)
+        content = formatter.iter_plain_text(entries, metadata)
         filename = f'{sanitized_name}_{timestamp}.txt'
         mimetype = 'text/plain'
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False,
-                                               suffix='.txt', encoding='utf-8')
-        temp_file.write(content)
-        temp_file.close()
 
-    return send_file(temp_file.name,
-                    mimetype=mimetype,
-                    as_attachment=True,
-                    download_name=filename)
+    return send_export(content, mimetype, filename)
 
 @app.route('/api/settings', methods=['GET'])
 def get_settings():
@@ -838,14 +1115,10 @@ def get_settings():
     })
 
 @app.route('/api/settings/index-name', methods=['POST'])
-def set_index_name():
+@json_fields('name', error='Name is required')
+def set_index_name(name):
     """Set index name and rename database file to match"""
     db = get_current_db()
-    data = request.json
-    name = data.get('name', '').strip()
-
-    if not name:
-        return jsonify({'error': 'Name is required'}), 400
 
     try:
         # Get current database filename
@@ -879,15 +1152,13 @@ def set_index_name():
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/settings/color-scheme', methods=['POST'])
-def set_color_scheme():
+@json_fields('color', error='Invalid color format')
+def set_color_scheme(color):
     """Set color scheme"""
-    db = get_current_db()
-    data = request.json
-    color = data.get('color', '').strip()
-
     # Validate color format (hex color)
     if not color or not color.startswith('#') or len(color) != 7:
         return jsonify({'error': 'Invalid color format'}), 400
+    db = get_current_db()
 
     try:
         db.set_setting('color_scheme', color)
@@ -899,17 +1170,49 @@ def set_color_scheme():
 def backup_database():
     """Download the SQLite database file with timestamp"""
     db = get_current_db()
-    db_path = db.db_path
+    # Serve a consistent snapshot rather than the live file, which a checkpoint could
+    # rewrite mid-download; it is only regenerated after the database changes
+    snapshot_path = db_manager.backup_snapshot(Path(db.db_path).name)
     index_name = db.get_setting('index_name') or 'book_index'
     # Sanitize filename and add timestamp
-    safe_name = re.sub(r'[^\w\s-]', '', index_name).strip().replace(' ', '_')
+    safe_name = safe_file_stem(index_name)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = f"{safe_name}_{timestamp}.db"
 
-    return send_file(db_path,
+    # Conditional response: ETag/Last-Modified from the snapshot, and Range requests so
+    # an interrupted download of a large database can resume
+    return send_file(snapshot_path,
                     mimetype='application/x-sqlite3',
                     as_attachment=True,
-                    download_name=filename)
+                    download_name=filename,
+                    conditional=True,
+                    etag=True,
+                    last_modified=snapshot_path.stat().st_mtime,
+                    max_age=0)
+
+@app.route('/api/settings/backup.sql.gz', methods=['GET'])
+def backup_database_sql():
+    """Download the database as a gzip-compressed SQL dump, streamed as it is written"""
+    db = get_current_db()
+    index_name = db.get_setting('index_name') or 'book_index'
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"{safe_file_stem(index_name)}_{timestamp}.sql.gz"
+
+    def dump_chunks(batch_size=1000):
+        batch = []
+        for statement in db.iterdump():
+            batch.append(statement)
+            if len(batch) >= batch_size:
+                yield ('\n'.join(batch) + '\n').encode('utf-8')
+                batch = []
+        if batch:
+            yield ('\n'.join(batch) + '\n').encode('utf-8')
+
+    compressor = zlib.compressobj(3, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    response = Response(stream_with_context(_compress_chunks(dump_chunks(), compressor)),
+                        mimetype='application/gzip')
+    set_attachment(response, filename)
+    return response
 
 @app.route('/api/settings/clear', methods=['POST'])
 def clear_database():
@@ -926,9 +1229,13 @@ def get_custom_properties():
     """Get all custom properties"""
     db = get_current_db()
     if db is None:
-        return jsonify({'properties': []})
+        return empty_list_response('properties')
+    # Properties only change when the database is written to, as with /api/entries
+    etag = db_etag(db)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
     properties = db.get_all_custom_properties()
-    return jsonify({
+    response = jsonify({
         'properties': [{
             'id': prop[0],
             'property_name': prop[1],
@@ -936,17 +1243,14 @@ def get_custom_properties():
             'display_order': prop[3]
         } for prop in properties]
     })
+    response.set_etag(etag, weak=True)
+    return response
 
 @app.route('/api/custom-properties', methods=['POST'])
-def add_custom_property():
+@json_fields('property_name', 'property_value', error='Property name and value are required')
+def add_custom_property(property_name, property_value):
     """Add a new custom property"""
     db = get_current_db()
-    data = request.json
-    property_name = data.get('property_name', '').strip()
-    property_value = data.get('property_value', '').strip()
-
-    if not property_name or not property_value:
-        return jsonify({'error': 'Property name and value are required'}), 400
 
     try:
         property_id = db.add_custom_property(property_name, property_value)
@@ -959,15 +1263,10 @@ def add_custom_property():
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/custom-properties/<int:property_id>', methods=['PUT'])
-def update_custom_property(property_id):
+@json_fields('property_name', 'property_value', error='Property name and value are required')
+def update_custom_property(property_id, property_name, property_value):
     """Update an existing custom property"""
     db = get_current_db()
-    data = request.json
-    property_name = data.get('property_name', '').strip()
-    property_value = data.get('property_value', '').strip()
-
-    if not property_name or not property_value:
-        return jsonify({'error': 'Property name and value are required'}), 400
 
     try:
         success = db.update_custom_property(property_id, property_name, property_value)
@@ -994,12 +1293,12 @@ def delete_custom_property(property_id):
 @app.route('/api/custom-properties/reorder', methods=['POST'])
 def reorder_custom_properties():
     """Reorder custom properties"""
-    db = get_current_db()
-    data = request.json
+    data = json_body()
     property_ids = data.get('property_ids', [])
 
     if not property_ids:
         return jsonify({'error': 'Property IDs are required'}), 400
+    db = get_current_db()
 
     try:
         db.reorder_custom_properties(property_ids)
@@ -1012,24 +1311,25 @@ def get_books():
     """Get all books"""
     db = get_current_db()
     if db is None:
-        return jsonify({'books': []})
+        return empty_list_response('books')
+    # Books only change when the database is written to, as with /api/entries
+    etag = db_etag(db)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
     books = db.get_all_books()
-    return jsonify({
+    response = jsonify({
         'books': [{'book_number': num, 'book_name': name, 'page_count': pages}
                   for num, name, pages in books]
     })
+    response.set_etag(etag, weak=True)
+    return response
 
 @app.route('/api/books/add', methods=['POST'])
-def add_book():
+@json_fields('book_number', 'book_name', error='Book number and name are required')
+def add_book(book_number, book_name):
     """Add a new book"""
     db = get_current_db()
-    data = request.json
-    book_number = data.get('book_number', '').strip()
-    book_name = data.get('book_name', '').strip()
-    page_count = data.get('page_count', 0)
-
-    if not book_number or not book_name:
-        return jsonify({'error': 'Book number and name are required'}), 400
+    page_count = json_body().get('page_count', 0)
 
     try:
         page_count = int(page_count) if page_count else 0
@@ -1046,17 +1346,11 @@ def add_book():
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/books/update', methods=['POST'])
-def update_book():
+@json_fields('old_number', 'book_number', 'book_name', error='All fields are required')
+def update_book(old_number, book_number, book_name):
     """Update a book"""
     db = get_current_db()
-    data = request.json
-    old_number = data.get('old_number', '').strip()
-    book_number = data.get('book_number', '').strip()
-    book_name = data.get('book_name', '').strip()
-    page_count = data.get('page_count', 0)
-
-    if not old_number or not book_number or not book_name:
-        return jsonify({'error': 'All fields are required'}), 400
+    page_count = json_body().get('page_count', 0)
 
     try:
         page_count = int(page_count) if page_count else 0
@@ -1072,6 +1366,43 @@ def update_book():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+def _book_row(item, *fields):
+    """Stripped required fields of one book in a bulk request, plus its page count"""
+    values = tuple(str(item.get(field) or '').strip() for field in fields)
+    if not all(values):
+        raise ValueError(f"{', '.join(fields)} are required for every book")
+    page_count = item.get('page_count', 0)
+    try:
+        page_count = int(page_count) if page_count else 0
+    except ValueError:
+        raise ValueError('Page count must be a number')
+    return values + (page_count,)
+
+@app.route('/api/books/bulk', methods=['POST'])
+def bulk_books():
+    """
+    Add, update and delete several books with one request and one transaction
+    Body: {'add': [book], 'update': [book with old_number], 'delete': [book_number]}
+    """
+    data = json_body()
+    db = get_current_db()
+    try:
+        add = [_book_row(item, 'book_number', 'book_name') for item in data.get('add', [])]
+        update = [_book_row(item, 'old_number', 'book_number', 'book_name')
+                  for item in data.get('update', [])]
+        delete = [str(number).strip() for number in data.get('delete', [])]
+        added, updated, deleted = db.apply_book_changes(add, update, delete)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'success': True,
+        'message': f'{added} added, {updated} updated, {deleted} deleted',
+        'added': added,
+        'updated': updated,
+        'deleted': deleted
+    })
+
 @app.route('/api/books/reference-count/<book_number>', methods=['GET'])
 def get_book_reference_count(book_number):
     """Get count of references and exclusions for a book"""
@@ -1087,14 +1418,10 @@ def get_book_reference_count(book_number):
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/books/delete', methods=['POST'])
-def delete_book():
+@json_fields('book_number', error='Book number is required')
+def delete_book(book_number):
     """Delete a book and all associated references and exclusions"""
     db = get_current_db()
-    data = request.json
-    book_number = data.get('book_number', '').strip()
-
-    if not book_number:
-        return jsonify({'error': 'Book number is required'}), 400
 
     try:
         # Delete book custom properties first
@@ -1129,15 +1456,10 @@ def get_book_properties(book_number):
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/books/<book_number>/properties', methods=['POST'])
-def add_book_property(book_number):
+@json_fields('property_name', 'property_value', error='Property name and value are required')
+def add_book_property(book_number, property_name, property_value):
     """Add a custom property for a book"""
     db = get_current_db()
-    data = request.json
-    property_name = data.get('property_name', '').strip()
-    property_value = data.get('property_value', '').strip()
-
-    if not property_name or not property_value:
-        return jsonify({'error': 'Property name and value are required'}), 400
 
     try:
         property_id = db.add_book_custom_property(int(book_number), property_name, property_value)
@@ -1146,15 +1468,10 @@ def add_book_property(book_number):
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/books/properties/<int:property_id>', methods=['PUT'])
-def update_book_property(property_id):
+@json_fields('property_name', 'property_value', error='Property name and value are required')
+def update_book_property(property_id, property_name, property_value):
     """Update a book custom property"""
     db = get_current_db()
-    data = request.json
-    property_name = data.get('property_name', '').strip()
-    property_value = data.get('property_value', '').strip()
-
-    if not property_name or not property_value:
-        return jsonify({'error': 'Property name and value are required'}), 400
 
     try:
         updated = db.update_book_custom_property(property_id, property_name, property_value)
@@ -1182,7 +1499,7 @@ def delete_book_property(property_id):
 def reorder_book_properties(book_number):
     """Reorder custom properties for a book"""
     db = get_current_db()
-    data = request.json
+    data = json_body()
     property_ids = data.get('property_ids', [])
 
     try:
@@ -1191,96 +1508,108 @@ def reorder_book_properties(book_number):
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+def _gap_row(num, name, pages, gap_ranges, excluded_ranges, term_count):
+    """JSON row for one get_gap_analysis tuple"""
+    return {
+        'book_number': num,
+        'book_name': name,
+        'page_count': pages,
+        'gaps': gap_ranges,
+        'gap_count': len(gap_ranges),
+        'excluded': excluded_ranges,
+        'term_count': term_count
+    }
+
+def _gap_summary_row(num, name, pages, gap_ranges, excluded_ranges, term_count):
+    """JSON row for one get_gap_analysis tuple with counts in place of the range lists"""
+    return {
+        'book_number': num,
+        'book_name': name,
+        'page_count': pages,
+        'gap_count': len(gap_ranges),
+        'excluded_count': len(excluded_ranges),
+        'term_count': term_count
+    }
+
+def _gap_columns(results, summary):
+    """Gap analysis as parallel per-field lists, for ?format=columns"""
+    nums, names, pages, gaps, excluded, term_counts = (
+        list(map(list, zip(*results))) or [[] for _ in range(6)])
+    payload = {
+        'book_number': nums,
+        'book_name': names,
+        'page_count': pages,
+        'gap_count': [len(ranges) for ranges in gaps],
+        'term_count': term_counts
+    }
+    if summary:
+        payload['excluded_count'] = [len(ranges) for ranges in excluded]
+    else:
+        payload['gaps'] = gaps
+        payload['excluded'] = excluded
+    return payload
+
 @app.route('/api/gap-analysis', methods=['GET'])
 def gap_analysis():
     """Perform gap analysis on all books"""
     db = get_current_db()
-    try:
-        results = db.get_gap_analysis()
-        return jsonify({
-            'results': [
-                {
-                    'book_number': num,
-                    'book_name': name,
-                    'page_count': pages,
-                    'gaps': gap_ranges,
-                    'gap_count': len(gap_ranges),
-                    'excluded': excluded_ranges,
-                    'term_count': term_count
-                }
-                for num, name, pages, gap_ranges, excluded_ranges, term_count in results
-            ]
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 400
-
-@app.route('/api/gap-exclusions/add', methods=['POST'])
-def add_gap_exclusion():
-    """Add a gap exclusion"""
-    db = get_current_db()
-    data = request.json
-    if not data:
-        return jsonify({'error': 'No data provided'}), 400
-
-    book_number = data.get('book_number', '').strip()
-    page_range = data.get('page_range', '').strip()
-
-    if not book_number or not page_range:
-        return jsonify({'error': 'Book number and page range are required'}), 400
+    # Gaps only change with books, exclusions or references, all of which change db.data_version()
+    etag = db_etag(db)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    # ?summary=1 sends only the counts for each book, not the gap and exclusion lists
+    summary = bool(request.args.get('summary'))
+    if request.args.get('format') == 'columns':
+        response = jsonify(_gap_columns(db.get_gap_analysis(), summary))
+        response.set_etag(etag, weak=True)
+        return response
+
+    to_row = _gap_summary_row if summary else _gap_row
+    results = db.iter_gap_analysis()
+    # Run the first book here so a failure still gets a JSON error response
+    first = next(results, None)
+
+    def generate():
+        # Each book is serialized and sent as soon as it is analysed
+        yield b'{"results":['
+        if first is not None:
+            yield _dump_json(to_row(*first))
+            for result in results:
+                yield b',' + _dump_json(to_row(*result))
+        yield b']}'
+
+    response = streamed_response(generate(), 'application/json')
+    response.set_etag(etag, weak=True)
+    return response
 
+def _change_gap_exclusion(op, book_number, page_range, success_message, failure, failure_status):
+    """Shared body of the gap-exclusion add/remove endpoints; op is the bound IndexDatabase method"""
     try:
-        # Parse page range (e.g., "10" or "10-15")
-        if '-' in page_range:
-            parts = page_range.split('-')
-            page_start = int(parts[0])
-            page_end = int(parts[1])
-        else:
-            page_start = int(page_range)
-            page_end = page_start
-
-        added = db.add_gap_exclusion(book_number, page_start, page_end)
-        if added:
-            return jsonify({'success': True, 'message': f'Excluded pages {page_range} from gap analysis'})
-        else:
-            return jsonify({'error': 'Exclusion already exists'}), 409
+        page_start, page_end = parse_page_range(page_range)
     except ValueError as e:
         return jsonify({'error': f'Invalid page range: {str(e)}'}), 400
-    except Exception as e:
-        return jsonify({'error': str(e)}), 400
-
-@app.route('/api/gap-exclusions/remove', methods=['POST'])
-def remove_gap_exclusion():
-    """Remove a gap exclusion"""
-    db = get_current_db()
-    data = request.json
-    if not data:
-        return jsonify({'error': 'No data provided'}), 400
-
-    book_number = data.get('book_number', '').strip()
-    page_range = data.get('page_range', '').strip()
 
-    if not book_number or not page_range:
-        return jsonify({'error': 'Book number and page range are required'}), 400
+    # Other errors are reported by api_error
+    if not op(book_number, page_start, page_end):
+        return jsonify({'error': failure}), failure_status
+    if request.args.get('quiet') or 'return=minimal' in request.headers.get('Prefer', ''):
+        # Client asked for no body (Prefer: return=minimal or ?quiet=1)
+        return '', 204
+    return jsonify({'success': True, 'message': success_message.format(page_range)})
 
-    try:
-        # Parse page range
-        if '-' in page_range:
-            parts = page_range.split('-')
-            page_start = int(parts[0])
-            page_end = int(parts[1])
-        else:
-            page_start = int(page_range)
-            page_end = page_start
+@app.route('/api/gap-exclusions/add', methods=['POST'])
+@json_fields('book_number', 'page_range', error='Book number and page range are required')
+def add_gap_exclusion(book_number, page_range):
+    """Add a gap exclusion"""
+    return _change_gap_exclusion(get_current_db().add_gap_exclusion, book_number, page_range,
+                                 'Excluded pages {} from gap analysis', 'Exclusion already exists', 409)
 
-        deleted = db.remove_gap_exclusion(book_number, page_start, page_end)
-        if deleted:
-            return jsonify({'success': True, 'message': f'Re-included pages {page_range} in gap analysis'})
-        else:
-            return jsonify({'error': 'Exclusion not found'}), 404
-    except ValueError as e:
-        return jsonify({'error': f'Invalid page range: {str(e)}'}), 400
-    except Exception as e:
-        return jsonify({'error': str(e)}), 400
+@app.route('/api/gap-exclusions/remove', methods=['POST'])
+@json_fields('book_number', 'page_range', error='Book number and page range are required')
+def remove_gap_exclusion(book_number, page_range):
+    """Remove a gap exclusion"""
+    return _change_gap_exclusion(get_current_db().remove_gap_exclusion, book_number, page_range,
+                                 'Re-included pages {} in gap analysis', 'Exclusion not found', 404)
 
 # AI Term Enrichment endpoints
 @app.route('/api/ai/settings', methods=['GET'])
@@ -1294,15 +1623,22 @@ def get_ai_settings():
             'has_key': False
         })
 
+    # Settings only change when the database is written to, as with /api/entries
+    etag = db_etag(db)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
     enabled = db.get_setting('ai_enabled') == 'true'
     provider = db.get_setting('ai_provider') or ''
     api_key = db.get_setting('ai_api_key')
 
-    return jsonify({
+    response = jsonify({
         'enabled': enabled,
         'provider': provider,
         'has_key': bool(api_key)
     })
+    response.set_etag(etag, weak=True)
+    return response
 
 @app.route('/api/ai/settings', methods=['POST'])
 def save_ai_settings():
@@ -1311,7 +1647,7 @@ def save_ai_settings():
     if db is None:
         return jsonify({'error': 'No database selected'}), 400
 
-    data = request.json
+    data = json_body()
     if not data:
         return jsonify({'error': 'No data provided'}), 400
 
@@ -1335,10 +1671,29 @@ def save_ai_settings():
         'message': 'AI settings saved'
     })
 
+@lru_cache(maxsize=4)
+def ai_client(provider, api_key):
+    """
+    SDK client for an AI provider, reused across requests so its HTTP connection
+    pool (and TLS sessions) survive between calls
+    Raises ImportError if the provider's package isn't installed
+    """
+    if provider == 'anthropic':
+        import anthropic
+        return anthropic.Anthropic(api_key=api_key)
+    if provider == 'openai':
+        import openai
+        return openai.OpenAI(api_key=api_key)
+    raise ValueError(f'Unknown provider: {provider}')
+
+# Seconds to wait for the provider when validating a key
+AI_VALIDATE_TIMEOUT = 5.0
+_validate_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='validate-key')
+
 @app.route('/api/ai/validate-key', methods=['POST'])
 def validate_ai_key():
     """Validate an AI API key by making a minimal API call"""
-    data = request.json
+    data = json_body()
     if not data:
         return jsonify({'error': 'No data provided'}), 400
 
@@ -1350,40 +1705,23 @@ def validate_ai_key():
     if not api_key:
         return jsonify({'error': 'No API key provided'}), 400
 
+    if provider not in ('anthropic', 'openai'):
+        return jsonify({'error': f'Unknown provider: {provider}'}), 400
     try:
-        if provider == 'anthropic':
-            try:
-                import anthropic
-            except ImportError:
-                return jsonify({'error': 'anthropic package not installed'}), 400
-
-            client = anthropic.Anthropic(api_key=api_key)
-            # Make a minimal API call to validate the key
-            message = client.messages.create(
-                model="claude-haiku-4-20250514",
-                max_tokens=10,
-                messages=[{"role": "user", "content": "Hi"}]
-            )
-            return jsonify({'valid': True, 'message': 'API key is valid'})
-
-        elif provider == 'openai':
-            try:
-                import openai
-            except ImportError:
-                return jsonify({'error': 'openai package not installed'}), 400
-
-            client = openai.OpenAI(api_key=api_key)
-            # Make a minimal API call to validate the key
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                max_tokens=10,
-                messages=[{"role": "user", "content": "Hi"}]
-            )
-            return jsonify({'valid': True, 'message': 'API key is valid'})
-
-        else:
-            return jsonify({'error': f'Unknown provider: {provider}'}), 400
+        client = ai_client(provider, api_key)
+    except ImportError:
+        return jsonify({'error': f'{provider} package not installed'}), 400
 
+    try:
+        # Make a minimal API call to validate the key; a hung provider must not hold this
+        # request thread, so the call gets a short SDK timeout and a hard wall-clock limit
+        client = client.with_options(timeout=AI_VALIDATE_TIMEOUT, max_retries=0)
+        future = _validate_executor.submit(_ai_complete, client, provider, "Hi", max_tokens=10)
+        future.result(timeout=AI_VALIDATE_TIMEOUT + 1)
+        return jsonify({'valid': True, 'message': 'API key is valid'})
+
+    except FutureTimeout:
+        return jsonify({'valid': False, 'message': 'Validation timed out; try again'})
     except Exception as e:
         error_msg = str(e)
         # Check for common authentication errors
@@ -1391,15 +1729,39 @@ def validate_ai_key():
             return jsonify({'valid': False, 'message': 'Invalid API key'})
         return jsonify({'valid': False, 'message': f'Validation failed: {error_msg}'})
 
+# (mtime, size) of ai_prompts.json -> its parsed contents
+_ai_prompts_cache = {}
+
+def load_ai_prompts():
+    """
+    Parsed static/ai_prompts.json, re-read only when the file changes
+    Callers must not modify the returned dict
+    """
+    prompts_path = Path(app.static_folder) / 'ai_prompts.json'
+    stat = prompts_path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    prompts = _ai_prompts_cache.get(key)
+    if prompts is None:
+        data = prompts_path.read_bytes()
+        # Through app.json like request bodies; orjson.JSONDecodeError subclasses
+        # json.JSONDecodeError, so callers catch either
+        prompts = app.json.loads(data)
+        _ai_prompts_cache.clear()
+        _ai_prompts_cache[key] = prompts
+    return prompts
+
 @app.route('/api/ai/prompts', methods=['GET'])
 def get_ai_prompts():
     """Get AI prompts configuration"""
-    import json
-    prompts_path = os.path.join(app.static_folder, 'ai_prompts.json')
     try:
-        with open(prompts_path, 'r') as f:
-            prompts_data = json.load(f)
-        return jsonify(prompts_data)
+        # The prompts only change with the file, so tag the response with its mtime and size
+        stat = (Path(app.static_folder) / 'ai_prompts.json').stat()
+        etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        response = jsonify(load_ai_prompts())
+        response.set_etag(etag, weak=True)
+        return response
     except FileNotFoundError:
         return jsonify({'error': 'Prompts file not found'}), 404
     except json.JSONDecodeError as e:
@@ -1436,11 +1798,28 @@ def get_ai_terms():
             ]
         })
 
+# Terms per enrichment prompt, and how many of those prompts are sent at once
+ENRICH_BATCH_SIZE = 50
+ENRICH_CONCURRENCY = 4
+
+# Background AI enrichment jobs: job id -> status dict (see enrich_terms)
+_enrich_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='enrich')
+_enrich_jobs = {}
+_enrich_jobs_lock = threading.Lock()
+# Finished jobs nobody polls (closed tab) are dropped this many seconds after finishing
+ENRICH_JOB_TTL = 3600
+_enrich_finished = {}  # job id -> time.monotonic() when it finished
+
+def _prune_enrich_jobs():
+    """Forget finished jobs older than ENRICH_JOB_TTL; call with _enrich_jobs_lock held"""
+    cutoff = time.monotonic() - ENRICH_JOB_TTL
+    for job_id in [j for j, finished in _enrich_finished.items() if finished < cutoff]:
+        del _enrich_finished[job_id]
+        _enrich_jobs.pop(job_id, None)
+
 @app.route('/api/ai/enrich', methods=['POST'])
 def enrich_terms():
-    """Enrich terms using AI API"""
-    import json as json_module
-
+    """Start enriching terms without notes using the AI API; returns a job id to poll"""
     db = get_current_db()
     if db is None:
         return jsonify({'error': 'No database selected'}), 400
@@ -1462,11 +1841,9 @@ def enrich_terms():
         return jsonify({'message': 'No terms without notes to enrich', 'enriched': 0})
 
     # Load prompt configuration from JSON file
-    prompts_path = os.path.join(app.static_folder, 'ai_prompts.json')
     try:
-        with open(prompts_path, 'r') as f:
-            prompts_config = json_module.load(f)
-    except (FileNotFoundError, json_module.JSONDecodeError):
+        prompts_config = load_ai_prompts()
+    except (FileNotFoundError, json.JSONDecodeError):
         return jsonify({'error': 'Could not load AI prompts configuration'}), 500
 
     if provider not in prompts_config.get('prompts', {}):
@@ -1474,11 +1851,6 @@ def enrich_terms():
 
     provider_config = prompts_config['prompts'][provider]
 
-    # Build prompt with term list
-    term_prefix = prompts_config.get('term_prefix', '- ')
-    term_separator = prompts_config.get('term_list_separator', '\n')
-    term_list = term_separator.join(f"{term_prefix}{t[1]}" for t in terms)
-
     # Get index name for $course_title
     index_name = db.get_setting('index_name') or 'Untitled Index'
 
@@ -1486,111 +1858,145 @@ def enrich_terms():
     prompt_template = provider_config.get('prompt', '')
     model_name = provider_config.get('model', '')
     prompt = prompt_template.replace('$course_title', index_name).replace('$model', model_name)
-    prompt = prompt + '\n' + term_list
 
-    try:
-        if provider == 'anthropic':
-            try:
-                import anthropic
-            except ImportError:
-                return jsonify({'error': 'anthropic package not installed. Run: pip install anthropic'}), 400
-
-            client = anthropic.Anthropic(api_key=api_key)
-            message = client.messages.create(
-                model="claude-haiku-4-20250514",  # Cost-effective model
-                max_tokens=4096,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            response_text = message.content[0].text
-
-        elif provider == 'openai':
-            try:
-                import openai
-            except ImportError:
-                return jsonify({'error': 'openai package not installed. Run: pip install openai'}), 400
-
-            client = openai.OpenAI(api_key=api_key)
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",  # Cost-effective model
-                max_tokens=4096,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            response_text = response.choices[0].message.content
+    # One prompt per batch of terms, each followed by its term list; batches keep each reply
+    # well inside max_tokens and run concurrently, and one failing doesn't lose the rest
+    term_prefix = prompts_config.get('term_prefix', '- ')
+    term_separator = prompts_config.get('term_list_separator', '\n')
+    prompts = [
+        prompt + '\n' + term_separator.join(f"{term_prefix}{t[1]}" for t in terms[i:i + ENRICH_BATCH_SIZE])
+        for i in range(0, len(terms), ENRICH_BATCH_SIZE)
+    ]
 
-        else:
-            return jsonify({'error': f'Unknown provider: {provider}'}), 400
-
-        # Parse CSV response and update notes
-        enriched_count = 0
-        term_map = {t[1].lower(): t[0] for t in terms}
-
-        # Parse CSV response
-        import csv
-        import io
-        reader = csv.reader(io.StringIO(response_text))
-        header_skipped = False
-
-        for row in reader:
-            if len(row) >= 2:
-                # Skip header row
-                if not header_skipped and row[0].lower() == 'term':
-                    header_skipped = True
-                    continue
-                header_skipped = True
-
-                term_name = row[0].strip()
-                description = row[1].strip()
-
-                # Find matching term and update notes
-                term_id = term_map.get(term_name.lower())
-                if term_id:
-                    db.update_notes(term_name, description)
-                    enriched_count += 1
+    if provider not in ('anthropic', 'openai'):
+        return jsonify({'error': f'Unknown provider: {provider}'}), 400
+    try:
+        client = ai_client(provider, api_key)
+    except ImportError:
+        return jsonify({'error': f'{provider} package not installed. Run: pip install {provider}'}), 400
+
+    # The API call can take a while; run it in the background and let the page poll
+    job_id = uuid.uuid4().hex
+    with _enrich_jobs_lock:
+        _prune_enrich_jobs()
+        _enrich_jobs[job_id] = {'status': 'running', 'completed': 0, 'total': len(prompts)}
+    _enrich_executor.submit(_run_enrichment, job_id, db, client, provider, prompts)
+    return jsonify({'success': True, 'job_id': job_id, 'status': 'running'}), 202
+
+@app.route('/api/ai/enrich/<job_id>', methods=['GET'])
+def enrich_terms_status(job_id):
+    """Status of a background enrichment job; a finished job is forgotten once reported"""
+    with _enrich_jobs_lock:
+        job = _enrich_jobs.get(job_id)
+        if job is not None and job['status'] != 'running':
+            del _enrich_jobs[job_id]
+            _enrich_finished.pop(job_id, None)
+    if job is None:
+        return jsonify({'error': 'Unknown enrichment job'}), 404
+    if job['status'] == 'error':
+        return jsonify(job), 500
+    return jsonify(job)
+
+def _ai_complete(client, provider, prompt, max_tokens=4096):
+    """Send one prompt to the provider and return the reply text"""
+    if provider == 'anthropic':
+        message = client.messages.create(
+            model="claude-haiku-4-20250514",  # Cost-effective model
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return message.content[0].text
+
+    response = client.chat.completions.create(
+        model="gpt-4o-mini",  # Cost-effective model
+        max_tokens=max_tokens,
+        messages=[{"role": "user", "content": prompt}]
+    )
+    return response.choices[0].message.content
 
-        return jsonify({
+def _run_enrichment(job_id, db, client, provider, prompts):
+    """
+    Background half of enrich_terms: send the prompts concurrently, then store the
+    notes from every reply that came back
+    """
+    try:
+        replies = []
+        failures = []
+        with ThreadPoolExecutor(max_workers=ENRICH_CONCURRENCY) as pool:
+            futures = [pool.submit(_ai_complete, client, provider, prompt) for prompt in prompts]
+            for completed, future in enumerate(as_completed(futures), 1):
+                try:
+                    replies.append(future.result())
+                except Exception as e:
+                    failures.append(str(e))
+                with _enrich_jobs_lock:
+                    _enrich_jobs[job_id] = {'status': 'running', 'completed': completed, 'total': len(prompts)}
+
+        if not replies:
+            raise RuntimeError(failures[0])
+
+        # Parse the CSV replies, then write all the notes in one transaction; the database
+        # matches the names to existing terms without notes, so unknown names are dropped
+        enriched = []
+        for response_text in replies:
+            rows = (row for row in csv.reader(io.StringIO(response_text)) if len(row) >= 2)
+
+            # Skip the header row, if the response has one
+            first_row = next(rows, None)
+            if first_row is not None and first_row[0].casefold() != 'term':
+                rows = itertools.chain([first_row], rows)
+
+            enriched.extend((row[0].strip(), row[1].strip()) for row in rows)
+
+        enriched_count = db.fill_empty_notes(enriched)
+
+        message = f'Enriched {enriched_count} terms with notes'
+        if failures:
+            message += f' ({len(failures)} of {len(prompts)} batches failed: {failures[0]})'
+        job = {
+            'status': 'done',
             'success': True,
-            'message': f'Enriched {enriched_count} terms with notes',
+            'message': message,
             'enriched': enriched_count
-        })
-
+        }
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        job = {'status': 'error', 'error': str(e)}
+
+    with _enrich_jobs_lock:
+        _enrich_jobs[job_id] = job
+        _enrich_finished[job_id] = time.monotonic()
+        _prune_enrich_jobs()
+
+# TERM:, DESCRIPTION: and TOOL: fields of one '---'-separated block in a pasted AI response
+AI_FIELD_RE = re.compile(r'(TERM|DESCRIPTION|TOOL):\s*(.+)', re.IGNORECASE)
 
 @app.route('/api/ai/import', methods=['POST'])
 def import_ai_data():
     """Import AI enrichment data from pasted text"""
-    db = get_current_db()
-    data = request.json
+    data = json_body()
     if not data or 'text' not in data:
         return jsonify({'error': 'No text provided'}), 400
+    db = get_current_db()
 
     response_text = data['text']
 
-    # Get all terms for matching
-    all_terms = db.get_all_terms_for_enrichment()
-    term_map = {t[1].lower(): t[0] for t in all_terms}
-
-    # Parse response
-    enriched_count = 0
-    blocks = response_text.split('---')
-    for block in blocks:
-        block = block.strip()
-        if not block:
+    # Parse response, then write all the descriptions in one transaction; the database
+    # matches the names to existing terms, so unknown names are dropped
+    enriched = []
+    for block in response_text.split('---'):
+        # One scan per block; the first of each field wins
+        fields = {}
+        for name, value in AI_FIELD_RE.findall(block):
+            fields.setdefault(name.casefold(), value)
+        if len(fields) < 3:
             continue
 
-        term_match = re.search(r'TERM:\s*(.+)', block, re.IGNORECASE)
-        desc_match = re.search(r'DESCRIPTION:\s*(.+)', block, re.IGNORECASE)
-        tool_match = re.search(r'TOOL:\s*(Yes|No)', block, re.IGNORECASE)
-
-        if term_match and desc_match and tool_match:
-            term_name = term_match.group(1).strip()
-            description = desc_match.group(1).strip()
-            is_tool = tool_match.group(1).lower() == 'yes'
+        tool = fields['tool'].lstrip()[:3].casefold()
+        if not tool.startswith(('yes', 'no')):
+            continue
+        enriched.append((fields['term'].strip(), fields['description'].strip(), tool == 'yes'))
 
-            term_id = term_map.get(term_name.lower())
-            if term_id:
-                db.update_term_ai_data(term_id, description, is_tool)
-                enriched_count += 1
+    enriched_count = db.update_terms_ai_data_bulk(enriched)
 
     return jsonify({
         'success': True,
@@ -1604,26 +2010,25 @@ def export_ai_data():
     db = get_current_db()
     terms = db.get_all_terms_for_enrichment()
 
-    # Build CSV content
-    lines = ['Term,Description,Tool']
-    for term_id, term, description, is_tool in terms:
-        desc_escaped = (description or '').replace('"', '""')
-        tool_str = 'Yes' if is_tool == 1 else ('No' if is_tool == 0 else '')
-        lines.append(f'"{term}","{desc_escaped}","{tool_str}"')
-
-    content = '\n'.join(lines)
-
-    # Create temp file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-        f.write(content)
-        temp_path = f.name
-
-    return send_file(
-        temp_path,
-        as_attachment=True,
-        download_name='term_descriptions.csv',
-        mimetype='text/csv'
-    )
+    def csv_chunks(chunk_size=1000):
+        # csv.writer does the quoting (terms containing quotes were written unescaped before);
+        # QUOTE_ALL keeps every field quoted as the file always has been
+        buf = io.StringIO()
+        writer = csv.writer(buf, quoting=csv.QUOTE_ALL, lineterminator='\n')
+        buf.write('Term,Description,Tool\n')
+        rows = (
+            (term, description or '', 'Yes' if is_tool == 1 else ('No' if is_tool == 0 else ''))
+            for _, term, description, is_tool in terms
+        )
+        for batch in iter(lambda: list(itertools.islice(rows, chunk_size)), []):
+            writer.writerows(batch)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+
+    return send_export(csv_chunks(), 'text/csv', 'term_descriptions.csv')
 
 @app.route('/api/ai/copy-prompt', methods=['GET'])
 def get_copy_prompt():
@@ -1667,4 +2072,16 @@ if __name__ == '__main__':
     print("  Alternative: http://localhost:5000")
     print("\nPress Ctrl+C to stop the server")
     print("=" * 60)
-    app.run(debug=True, host='127.0.0.1', port=5000)
+    if os.environ.get('PAGESAGE_DEV'):
+        # Debugger and auto-reloader, for working on the app itself
+        app.run(debug=True, host='127.0.0.1', port=5000)
+    else:
+        # Multi-threaded server without the debugger and reloader
+        try:
+            from waitress import serve
+        except ImportError:
+            print("waitress not installed (pip install waitress), using the threaded Flask server")
+            app.run(debug=False, threaded=True, host='127.0.0.1', port=5000)
+        else:
+            serve(app, host='127.0.0.1', port=5000, threads=8,
+                  connection_limit=200, channel_timeout=60)
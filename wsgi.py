@@ -0,0 +1,6 @@
+"""
+WSGI entry point for running Page Sage under a production server, e.g.
+
+    gunicorn -c gunicorn_conf.py wsgi:application
+"""
+from web_app import app as application